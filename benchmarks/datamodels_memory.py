@@ -0,0 +1,111 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+"""
+Compares the memory used by the repository definitions built
+with the plain, slotted and frozen datamodels.
+
+Usage: python benchmarks/datamodels_memory.py [repositories] [reports]
+"""
+
+import gc
+import sys
+import tracemalloc
+from functools import partial
+
+from connect.reports.datamodels import (
+    ChoicesParameterDefinition,
+    ParameterDefinition,
+    RendererDefinition,
+    ReportDefinition,
+    RepositoryDefinition,
+    slotted,
+)
+
+
+def _get_models(frozen=None):
+    models = (
+        RepositoryDefinition,
+        ReportDefinition,
+        RendererDefinition,
+        ParameterDefinition,
+        ChoicesParameterDefinition,
+    )
+    if frozen is None:
+        return models
+    return tuple(slotted(model, frozen=frozen) for model in models)
+
+
+def _create_repository(models, idx, reports):
+    repo_cls, report_cls, renderer_cls, param_cls, choices_cls = models
+    return repo_cls(
+        root_path=f'/repos/{idx}',
+        readme_file='README.md',
+        name=f'Repository {idx}',
+        version='1.0.0',
+        reports=[
+            report_cls(
+                root_path=f'/repos/{idx}',
+                name=f'Report {report}',
+                readme_file=f'reports/report_{report}/README.md',
+                entrypoint=f'reports.report_{report}.entrypoint.generate',
+                audience=['provider', 'vendor'],
+                report_spec='2',
+                renderers=[
+                    renderer_cls(
+                        root_path=f'/repos/{idx}',
+                        id=renderer_type,
+                        type=renderer_type,
+                        description=f'Export data in {renderer_type}.',
+                        default=renderer_type == 'xlsx',
+                        template='template.xlsx' if renderer_type == 'xlsx' else None,
+                    )
+                    for renderer_type in ('xlsx', 'json', 'csv')
+                ],
+                parameters=[
+                    param_cls(
+                        id='date',
+                        type='date_range',
+                        name='Report period',
+                        description='Period of the report.',
+                    ),
+                    choices_cls(
+                        id='status',
+                        type='checkbox',
+                        name='Status',
+                        description='Statuses to include.',
+                        choices=[{'value': 'active', 'label': 'Active'}],
+                    ),
+                ],
+            )
+            for report in range(reports)
+        ],
+    )
+
+
+def _measure(factory, repositories):
+    gc.collect()
+    tracemalloc.start()
+    catalogue = [factory(idx) for idx in range(repositories)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalogue
+    return size
+
+
+def main(repositories=1000, reports=10):
+    variants = (
+        ('dataclass', _get_models()),
+        ('slotted', _get_models(frozen=False)),
+        ('frozen', _get_models(frozen=True)),
+    )
+    baseline = None
+    for label, models in variants:
+        size = _measure(partial(_create_repository, models, reports=reports), repositories)
+        baseline = baseline or size
+        print(
+            f'{label:>10}: {size / 1024 / 1024:.1f} MiB '
+            f'({size / baseline:.0%} of dataclass)',
+        )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,63 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+"""
+Measures the time needed to import the public modules in a fresh
+interpreter and lists the heavy dependencies each of them pulls in.
+The validator must not import any renderer dependency.
+
+Usage: python benchmarks/import_time.py [repeat]
+"""
+
+import subprocess
+import sys
+
+
+MODULES = (
+    'connect.reports.validator',
+    'connect.reports.parser',
+    'connect.reports.renderers',
+    'connect.reports.renderers.xlsx',
+    'connect.reports.renderers.pdf',
+)
+
+HEAVY_DEPENDENCIES = ('weasyprint', 'openpyxl', 'jinja2', 'orjson', 'pyarrow')
+
+SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {dependencies!r} if name in sys.modules]
+print(elapsed, ','.join(loaded))
+'''
+
+
+def measure(module):
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            SCRIPT.format(module=module, dependencies=HEAVY_DEPENDENCIES),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    elapsed, _, loaded = result.stdout.strip().splitlines()[-1].partition(' ')
+    return float(elapsed), loaded
+
+
+def main(repeat=5):
+    for module in MODULES:
+        try:
+            timings, loaded = zip(*[measure(module) for _ in range(repeat)])
+        except subprocess.CalledProcessError:
+            print(f'{module:>32}: import failed')
+            continue
+        print(
+            f'{module:>32}: best {min(timings) * 1000:.0f}ms, '
+            f'loads {loaded[0] or "-"}',
+        )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,91 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+"""
+Measures size and time of the PDFRenderer output options, both for the
+generated PDF and for the final zip pack.
+
+Usage: python benchmarks/pdf_compression.py [rows] [repeat]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import timeit
+import zipfile
+
+from PIL import Image
+
+from connect.reports.datamodels import Account, Report
+from connect.reports.renderers.pdf import PDFRenderer
+
+
+TEMPLATE = '''
+<html>
+    <head><title>Benchmark</title></head>
+    <body>
+        <img src="logo.png" style="width: 5cm">
+        <table>
+            {% for row in data %}
+            <tr>{% for col in row %}<td>{{ col }}</td>{% endfor %}</tr>
+            {% endfor %}
+        </table>
+    </body>
+</html>
+'''
+
+OPTIONS = (
+    ('uncompressed', {}),
+    ('compressed', {'compress_pdf': True}),
+    ('optimized', {'compress_pdf': True, 'optimize_images': True}),
+    (
+        'optimized_lossy',
+        {'compress_pdf': True, 'optimize_images': True, 'jpeg_quality': 60, 'dpi': 96},
+    ),
+)
+
+
+def _create_image(path):
+    image = Image.effect_mandelbrot((1200, 1200), (-2, -1.5, 1, 1.5), 100).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    with open(path, 'wb') as fp:
+        fp.write(buffer.getvalue())
+
+
+def _render(root_dir, data, args):
+    renderer = PDFRenderer(
+        'benchmark',
+        root_dir,
+        Account(id='VA-000', name='Vendor'),
+        Report(id='R-000', name='Benchmark', description='', values=[]),
+        template='report/template.html.j2',
+        args=args,
+    )
+    return renderer.render(data, os.path.join(root_dir, 'output'))
+
+
+def main(rows=1000, repeat=3):
+    data = [[f'row_{i}_col_{j}' for j in range(8)] for i in range(rows)]
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.makedirs(os.path.join(root_dir, 'report'))
+        with open(os.path.join(root_dir, 'report/template.html.j2'), 'w') as fp:
+            fp.write(TEMPLATE)
+        _create_image(os.path.join(root_dir, 'logo.png'))
+        for label, args in OPTIONS:
+            timings = timeit.repeat(
+                lambda: _render(root_dir, data, args),  # noqa: B023
+                number=1,
+                repeat=repeat,
+            )
+            output_file = _render(root_dir, data, args)
+            with zipfile.ZipFile(output_file) as repzip:
+                pdf_size = repzip.getinfo('report.pdf').file_size
+            print(
+                f'{label:>16}: best {min(timings):.3f}s, '
+                f'pdf {pdf_size / 1024:.0f} KiB, '
+                f'zip {os.path.getsize(output_file) / 1024:.0f} KiB',
+            )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
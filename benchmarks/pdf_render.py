@@ -0,0 +1,59 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+"""
+Compares the PDFRenderer file based pipeline with the in-memory one.
+
+Usage: python benchmarks/pdf_render.py [rows] [repeat]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+from connect.reports.datamodels import Account, Report
+from connect.reports.renderers.pdf import PDFRenderer
+
+
+TEMPLATE = '''
+<html>
+    <head><title>Benchmark</title></head>
+    <body>
+        <table>
+            {% for row in data %}
+            <tr>{% for col in row %}<td>{{ col }}</td>{% endfor %}</tr>
+            {% endfor %}
+        </table>
+    </body>
+</html>
+'''
+
+
+def _render(root_dir, data, args):
+    renderer = PDFRenderer(
+        'benchmark',
+        root_dir,
+        Account(id='VA-000', name='Vendor'),
+        Report(id='R-000', name='Benchmark', description='', values=[]),
+        template='report/template.html.j2',
+        args=args,
+    )
+    return renderer.render(data, os.path.join(root_dir, 'output'))
+
+
+def main(rows=2000, repeat=3):
+    data = [[f'row_{i}_col_{j}' for j in range(8)] for i in range(rows)]
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.makedirs(os.path.join(root_dir, 'report'))
+        with open(os.path.join(root_dir, 'report/template.html.j2'), 'w') as fp:
+            fp.write(TEMPLATE)
+        for label, args in (('file', {}), ('in_memory', {'in_memory': True})):
+            timings = timeit.repeat(
+                lambda: _render(root_dir, data, args),  # noqa: B023
+                number=1,
+                repeat=repeat,
+            )
+            print(f'{label:>10}: best {min(timings):.3f}s of {repeat} ({rows} rows)')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,72 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+import os
+import threading
+from collections import OrderedDict
+
+
+def get_file_version(path):
+    """
+    Returns the (mtime, size) pair used to invalidate cached
+    file contents or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class LRUCache:
+    """
+    Thread safe least recently used cache bounded by the total
+    size of its entries. Entries bigger than the cache, or than
+    `max_entry_size` if set, are not stored.
+
+    :param max_size: Maximum total size of the cached entries.
+    :type max_size: int
+    :param max_entry_size: Maximum size of a single entry.
+    :type max_entry_size: int
+    """
+    def __init__(self, max_size, max_entry_size=None):
+        self.max_size = max_size
+        self.max_entry_size = min(max_size, max_entry_size or max_size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def set(self, key, value, size=1):
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            if size > self.max_entry_size:
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,27 +1,168 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
 import os
-from dataclasses import asdict, dataclass, field
+import threading
+import weakref
+from abc import ABCMeta
+from collections.abc import Sequence
+from dataclasses import (
+    FrozenInstanceError,
+    asdict,
+    dataclass,
+    field,
+    fields,
+    is_dataclass,
+)
 from functools import cached_property
 from typing import Any, Dict, List
 
+import orjson
 
-@dataclass
-class Account:
+from connect.reports.cache import LRUCache, get_file_version
+
+
+DEFAULT_DESCRIPTION_CACHE_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_DESCRIPTION_SIZE = 1024 * 1024
+
+description_cache = LRUCache(DEFAULT_DESCRIPTION_CACHE_SIZE, DEFAULT_MAX_DESCRIPTION_SIZE)
+
+
+def configure_description_cache(
+    max_size=DEFAULT_DESCRIPTION_CACHE_SIZE,
+    max_entry_size=DEFAULT_MAX_DESCRIPTION_SIZE,
+):
+    """
+    Replaces the process-wide cache of the readme files content.
+
+    :param max_size: Memory cap in bytes.
+    :type max_size: int
+    :param max_entry_size: Readme files bigger than this size
+                           are read from disk on each access.
+    :type max_entry_size: int
+    """
+    global description_cache
+    description_cache = LRUCache(max_size, max_entry_size)
+
+
+def read_description(path):
+    """
+    Returns the content of a readme file, cached by path and mtime.
+
+    :param path: Readme file path.
+    :type path: str
+    :returns: The readme file content.
+    :rtype: str
+    """
+    version = get_file_version(path)
+    if version is None or version[1] > description_cache.max_entry_size:
+        with open(path, 'r') as fp:
+            return fp.read()
+    key = (os.path.abspath(path), version)
+    description = description_cache.get(key)
+    if description is None:
+        with open(path, 'r') as fp:
+            description = fp.read()
+        description_cache.set(key, description, size=version[1])
+    return description
+
+
+DEFAULT_SERIALIZATION_CACHE_SIZE = 16 * 1024 * 1024
+
+serialization_cache = LRUCache(DEFAULT_SERIALIZATION_CACHE_SIZE)
+
+_generation = 0
+
+
+def configure_serialization_cache(max_size=DEFAULT_SERIALIZATION_CACHE_SIZE):
+    """
+    Replaces the process-wide cache of the serialized definitions.
+
+    :param max_size: Memory cap in bytes.
+    :type max_size: int
+    """
+    global serialization_cache
+    serialization_cache = LRUCache(max_size)
+
+
+def invalidate_serializations():
+    """
+    Discards every cached serialization.
+    Replacing an attribute of a definition, or the parameters and renderers
+    of a report, invalidates its serialization automatically, this must be
+    called after changing the content of a dict or a list, like the renderer
+    args, in place.
+    """
+    global _generation
+    _generation += 1
+
+
+def _get_values(definitions):
+    values = [len(definitions)]
+    for definition in definitions:
+        values.append(type(definition))
+        values.extend(getattr(definition, name) for name in definition.__dataclass_fields__)
+    return values
+
+
+def _memoize(obj, name, func, values, version=None):
+    """
+    Returns the bytes produced by `func` for `obj`, cached until one
+    of the `values` they are made of is replaced or the `version`
+    of their external sources changes.
+    """
+    key = (id(obj), name, _generation, version, tuple(map(id, values)))
+    entry = serialization_cache.get(key)
+    if entry is not None and entry[0]() is obj:
+        return entry[2]
+    value = func()
+    # the entry keeps the values alive, so their ids cannot be reused
+    # meanwhile, but only a weak reference to the definition.
+    serialization_cache.set(key, (weakref.ref(obj), values, value), size=len(value))
+    return value
+
+
+class _Model(metaclass=ABCMeta):  # noqa: B024
+    """
+    Base of the datamodels, comparing the values of their fields
+    so that the slotted variants are equal to the plain instances.
+    """
+    __slots__ = ()
+    __hash__ = None
+
+    def __eq__(self, other):
+        if not isinstance(other, _Model) or _get_origin(self) is not _get_origin(other):
+            return NotImplemented
+        return _get_state(self) == _get_state(other)
+
+
+class _Definition(_Model):
+    """
+    Base of the definitions whose serialization is cached.
+    """
+    __slots__ = ('__weakref__',)
+
+
+def get_local_id(entrypoint):
+    tokens = entrypoint.split('.')
+    return tokens[1] if len(tokens) > 2 else None
+
+
+@dataclass(eq=False)
+class Account(_Model):
     id: str
     name: str
 
 
-@dataclass
-class Report:
+@dataclass(eq=False)
+class Report(_Model):
     id: str
     name: str
     description: str
     values: List[Dict[str, Any]]
 
 
-@dataclass
-class RendererDefinition:
+@dataclass(eq=False)
+class RendererDefinition(_Definition):
     """
     Renderer representation on `reports.json` file descriptor.
 
@@ -49,8 +190,8 @@ class RendererDefinition:
     args: Dict[str, Any] = field(default=None)
 
 
-@dataclass
-class ParameterDefinition:
+@dataclass(eq=False)
+class ParameterDefinition(_Definition):
     """
     Parameter representation on `reports.json` file descriptor.
 
@@ -72,13 +213,13 @@ class ParameterDefinition:
     required: bool = False
 
 
-@dataclass
+@dataclass(eq=False)
 class ChoicesParameterDefinition(ParameterDefinition):
     choices: List[Dict[str, str]] = field(default_factory=list)
 
 
-@dataclass
-class ReportDefinition:
+@dataclass(eq=False)
+class ReportDefinition(_Definition):
     """
     Report representation on `reports.json` file descriptor.
 
@@ -116,14 +257,11 @@ class ReportDefinition:
 
     @property
     def local_id(self):
-        tokens = self.entrypoint.split('.')
-        return tokens[1] if len(tokens) > 2 else None
+        return get_local_id(self.entrypoint)
 
     @property
     def description(self):
-        path = os.path.join(self.root_path, self.readme_file)
-        with open(path, 'r') as fp:
-            return fp.read()
+        return read_description(os.path.join(self.root_path, self.readme_file))
 
     def get_parameters(self):
         return [
@@ -146,9 +284,132 @@ class ReportDefinition:
             )
         return renderer_list
 
+    def get_parameters_json(self):
+        """
+        Returns the parameters list encoded as JSON.
+
+        :rtype: bytes
+        """
+        return _memoize(
+            self,
+            'parameters',
+            lambda: orjson.dumps(self.get_parameters()),
+            _get_values(self.parameters),
+        )
+
+    def get_renderers_json(self):
+        """
+        Returns the renderers list encoded as JSON.
+
+        :rtype: bytes
+        """
+        return _memoize(
+            self,
+            'renderers',
+            lambda: orjson.dumps(self.get_renderers()),
+            _get_values(self.renderers),
+        )
 
-@dataclass
-class RepositoryDefinition:
+    def to_json(self):
+        """
+        Returns the report catalogue entry encoded as JSON.
+        It is cached until the definition or its readme file change.
+
+        :rtype: bytes
+        """
+        return _memoize(
+            self,
+            'catalogue',
+            self._dump_catalogue_entry,
+            [
+                self.root_path,
+                self.name,
+                self.readme_file,
+                self.entrypoint,
+                self.audience,
+                self.report_spec,
+                *_get_values(self.parameters),
+                *_get_values(self.renderers),
+            ],
+            get_file_version(os.path.join(self.root_path, self.readme_file)),
+        )
+
+    def _dump_catalogue_entry(self):
+        entry = orjson.dumps({
+            'local_id': self.local_id,
+            'name': self.name,
+            'description': self.description,
+            'entrypoint': self.entrypoint,
+            'audience': self.audience,
+            'report_spec': self.report_spec,
+        })
+        return b''.join((
+            entry[:-1],
+            b',"parameters":',
+            self.get_parameters_json(),
+            b',"renderers":',
+            self.get_renderers_json(),
+            b'}',
+        ))
+
+
+class LazyReportList(Sequence):
+    """
+    Read only list of reports parsed on first access.
+    Reports are indexed by local id and entrypoint with a single
+    pass over the raw descriptor content.
+
+    :param reports_data: Reports content within the reports descriptor.
+    :type reports_data: list
+    :param parse_report: Function creating a ReportDefinition from its content.
+    :type parse_report: callable
+    """
+    def __init__(self, reports_data, parse_report):
+        self._reports_data = reports_data
+        self._parse_report = parse_report
+        self._reports = [None] * len(reports_data)
+        self._lock = threading.Lock()
+        self._by_entrypoint = {}
+        self._by_local_id = {}
+        for idx, report in enumerate(reports_data):
+            self._by_entrypoint.setdefault(report['entrypoint'], idx)
+            self._by_local_id.setdefault(get_local_id(report['entrypoint']), idx)
+
+    @property
+    def parsed_count(self):
+        return sum(report is not None for report in self._reports)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        report = self._reports[idx]
+        if report is None:
+            with self._lock:
+                report = self._reports[idx]
+                if report is None:
+                    report = self._parse_report(self._reports_data[idx])
+                    self._reports[idx] = report
+        return report
+
+    def __len__(self):
+        return len(self._reports)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def get_by_local_id(self, local_id):
+        idx = self._by_local_id.get(local_id)
+        return self[idx] if idx is not None else None
+
+    def get_by_entrypoint(self, entrypoint):
+        idx = self._by_entrypoint.get(entrypoint)
+        return self[idx] if idx is not None else None
+
+
+@dataclass(eq=False)
+class RepositoryDefinition(_Definition):
     """
     Report repository representation on `reports.json` file descriptor.
 
@@ -172,8 +433,188 @@ class RepositoryDefinition:
     language: str = 'python'
     reports: List[ReportDefinition] = field(default_factory=list)
 
+    def get_report(self, local_id):
+        """
+        Returns the report with the given local id or None.
+        """
+        if isinstance(self.reports, LazyReportList):
+            return self.reports.get_by_local_id(local_id)
+        for report in self.reports:
+            if report.local_id == local_id:
+                return report
+
+    def get_report_by_entrypoint(self, entrypoint):
+        """
+        Returns the report with the given entrypoint or None.
+        """
+        if isinstance(self.reports, LazyReportList):
+            return self.reports.get_by_entrypoint(entrypoint)
+        for report in self.reports:
+            if report.entrypoint == entrypoint:
+                return report
+
     @property
     def description(self):
-        path = os.path.join(self.root_path, self.readme_file)
-        with open(path, 'r') as fp:
-            return fp.read()
+        return read_description(os.path.join(self.root_path, self.readme_file))
+
+    def to_json(self):
+        """
+        Returns the repository catalogue, with all its reports, encoded as JSON.
+        Reports entries are cached on their own, so changing a report
+        only encodes that report again.
+
+        :rtype: bytes
+        """
+        entry = _memoize(
+            self,
+            'catalogue',
+            lambda: orjson.dumps({
+                'name': self.name,
+                'description': self.description,
+                'version': self.version,
+                'language': self.language,
+            }),
+            [self.root_path, self.readme_file, self.name, self.version, self.language],
+            get_file_version(os.path.join(self.root_path, self.readme_file)),
+        )
+        return b''.join((
+            entry[:-1],
+            b',"reports":[',
+            b','.join(report.to_json() for report in self.reports),
+            b']}',
+        ))
+
+
+def dump_catalogue(repositories):
+    """
+    Encodes the catalogue of the given repositories as a JSON array,
+    reusing the cached serialization of unchanged definitions.
+
+    :param repositories: Repository definitions.
+    :type repositories: list
+    :returns: The encoded catalogue.
+    :rtype: bytes
+    """
+    return b''.join((
+        b'[',
+        b','.join(repo.to_json() for repo in repositories),
+        b']',
+    ))
+
+
+_CLASS_ATTRIBUTES = (
+    '__dict__',
+    '__weakref__',
+    '__abstractmethods__',
+    '_abc_impl',
+)
+
+_slotted_models = {}
+
+
+def _get_state(self):
+    return [getattr(self, f.name) for f in fields(self)]
+
+
+def _set_state(self, state):
+    for f, value in zip(fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+def _get_origin(obj):
+    return type(obj).__dict__.get('_origin', type(obj))
+
+
+def _set_once(self, name, value):
+    # slots are unset until __init__ assigns them
+    try:
+        getattr(self, name)
+    except AttributeError:
+        object.__setattr__(self, name, value)
+        return
+    raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+
+def _delete(self, name):
+    raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+
+def _hash(self):
+    return hash(tuple(_get_state(self)))
+
+
+def _create_slotted(cls, frozen):
+    bases = tuple(
+        slotted(base, frozen=frozen) if is_dataclass(base) else base
+        for base in cls.__bases__
+    )
+    annotations = cls.__dict__.get('__annotations__', {})
+    # The generated __init__, __repr__ and fields are reused as they are:
+    # the defaults are bound to __init__, not read from the class.
+    namespace = {
+        name: value for name, value in cls.__dict__.items()
+        if name not in _CLASS_ATTRIBUTES and name not in annotations
+    }
+    for name, value in namespace.items():
+        if isinstance(value, cached_property):
+            # cached_property needs the instance __dict__
+            namespace[name] = property(value.func, doc=value.__doc__)
+    name = f'{"Frozen" if frozen else "Slotted"}{cls.__name__}'
+    namespace.update({
+        '__slots__': tuple(annotations),
+        '__qualname__': name,
+        '__getstate__': _get_state,
+        '__setstate__': _set_state,
+        '_origin': cls,
+    })
+    if frozen:
+        namespace.update({
+            '__setattr__': _set_once,
+            '__delattr__': _delete,
+            '__hash__': _hash,
+        })
+    model = type(cls)(name, bases, namespace)
+    cls.register(model)
+    return model
+
+
+def slotted(cls, frozen=False):
+    """
+    Returns a variant of a datamodel class that uses `__slots__`
+    instead of a per-instance `__dict__`, keeping the same API.
+    Frozen variants are immutable and hashable as long as
+    the values of their fields are.
+
+    Variants are not real subclasses of the datamodel, whose instances
+    have a `__dict__`, but they are registered as virtual subclasses:
+    `isinstance` checks against the datamodel class succeed and
+    instances compare equal to the datamodel ones with the same values.
+
+    :param cls: Datamodel class.
+    :type cls: type
+    :param frozen: Return the frozen variant.
+    :type frozen: bool
+    :returns: The slotted datamodel class.
+    :rtype: type
+    """
+    key = (cls, frozen)
+    if key not in _slotted_models:
+        _slotted_models[key] = _create_slotted(cls, frozen)
+    return _slotted_models[key]
+
+
+SlottedAccount = slotted(Account)
+SlottedReport = slotted(Report)
+SlottedRendererDefinition = slotted(RendererDefinition)
+SlottedParameterDefinition = slotted(ParameterDefinition)
+SlottedChoicesParameterDefinition = slotted(ChoicesParameterDefinition)
+SlottedReportDefinition = slotted(ReportDefinition)
+SlottedRepositoryDefinition = slotted(RepositoryDefinition)
+
+FrozenAccount = slotted(Account, frozen=True)
+FrozenReport = slotted(Report, frozen=True)
+FrozenRendererDefinition = slotted(RendererDefinition, frozen=True)
+FrozenParameterDefinition = slotted(ParameterDefinition, frozen=True)
+FrozenChoicesParameterDefinition = slotted(ChoicesParameterDefinition, frozen=True)
+FrozenReportDefinition = slotted(ReportDefinition, frozen=True)
+FrozenRepositoryDefinition = slotted(RepositoryDefinition, frozen=True)
@@ -0,0 +1,165 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+
+from connect.reports.cache import get_file_version
+from connect.reports.parser import parse
+from connect.reports.validator import get_schema_errors, validate
+
+
+DESCRIPTOR_FILE = 'reports.json'
+CACHE_FORMAT_VERSION = 2
+PACKAGE_NAME = 'connect-reports-core'
+
+
+def get_referenced_files(repo):
+    """
+    Returns the paths of the readme, template and stylesheet
+    files referenced by a repository definition.
+
+    :param repo: Repository definition object.
+    :type repo: RepositoryDefinition
+    :returns: A list of file paths.
+    :rtype: list
+    """
+    paths = [os.path.join(repo.root_path, repo.readme_file)]
+    for report in repo.reports:
+        paths.append(os.path.join(report.root_path, report.readme_file))
+        for renderer in report.renderers:
+            if renderer.template:
+                paths.append(os.path.join(renderer.root_path, renderer.template))
+            if renderer.args and renderer.args.get('css_file'):
+                paths.append(os.path.join(renderer.root_path, renderer.args['css_file']))
+    return paths
+
+
+def get_entrypoint_paths(repo):
+    """
+    Returns the paths of the report packages and modules referenced
+    by the entrypoints of a repository definition, a report package
+    is either a directory or a `.py` file.
+
+    :param repo: Repository definition object.
+    :type repo: RepositoryDefinition
+    :returns: A list of paths.
+    :rtype: list
+    """
+    paths = []
+    for report in repo.reports:
+        tokens = report.entrypoint.split('.')
+        if len(tokens) >= 2:
+            report_root = os.path.join(report.root_path, tokens[0], tokens[1])
+            paths.extend((report_root, f'{report_root}.py'))
+    return paths
+
+
+def _get_path_version(path):
+    # only the existence of directories matters: their mtime
+    # changes with every compiled module written within them.
+    if os.path.isdir(path):
+        return 'directory'
+    return get_file_version(path)
+
+
+def _get_tracked_paths(repo):
+    return get_referenced_files(repo) + get_entrypoint_paths(repo)
+
+
+@lru_cache(maxsize=None)
+def _get_package_version():
+    try:
+        return metadata.version(PACKAGE_NAME)
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def _get_cache_file(cache_dir, root_path, content):
+    # a new release may change the validation rules or the datamodels
+    key = f'{CACHE_FORMAT_VERSION}:{_get_package_version()}:{os.path.abspath(root_path)}:'
+    digest = hashlib.sha256()
+    digest.update(key.encode('utf-8'))
+    digest.update(content)
+    return os.path.join(cache_dir, f'{digest.hexdigest()}.pickle')
+
+
+def _read_cache(cache_file):
+    try:
+        with open(cache_file, 'rb') as fp:
+            entry = pickle.load(fp)
+        if entry['version'] != CACHE_FORMAT_VERSION:
+            return None
+    except Exception:
+        # missing, corrupted or stale cache files are just ignored
+        return None
+    for path, version in entry['files'].items():
+        if _get_path_version(path) != version:
+            return None
+    return entry['repository']
+
+
+def _write_cache(cache_file, repo):
+    entry = {
+        'version': CACHE_FORMAT_VERSION,
+        'files': {path: _get_path_version(path) for path in _get_tracked_paths(repo)},
+        'repository': repo,
+    }
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump(entry, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+
+
+def load_repository(root_path, cache_dir=None, descriptor_file=DESCRIPTOR_FILE, max_workers=None):
+    """
+    Reads, validates and parses a reports repository.
+    If `cache_dir` is set, valid repositories are stored there as pickled
+    definitions keyed by a hash of the descriptor: while the descriptor,
+    the readme and template files it references and the report packages
+    of its entrypoints do not change, they are loaded from the cache
+    skipping the validation.
+    The cache directory must be only writable by trusted users.
+
+    :param root_path: Reports repository root path.
+    :type root_path: str
+    :param cache_dir: Directory of the compiled repositories cache.
+    :type cache_dir: str
+    :param descriptor_file: Reports descriptor file name.
+    :type descriptor_file: str
+    :param max_workers: Number of threads used to validate the reports.
+    :type max_workers: int
+    :returns: The repository definition, None if the descriptor
+              does not match the schema, and the list of errors.
+    :rtype: tuple
+    """
+    with open(os.path.join(root_path, descriptor_file), 'rb') as fp:
+        content = fp.read()
+
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = _get_cache_file(cache_dir, root_path, content)
+        repo = _read_cache(cache_file)
+        if repo is not None:
+            return repo, []
+
+    data = json.loads(content)
+    schema_errors = get_schema_errors(data)
+    if schema_errors:
+        return None, [str(error) for error in schema_errors]
+
+    repo = parse(root_path, data)
+    errors = validate(repo, max_workers=max_workers)
+    if not errors and cache_file is not None:
+        _write_cache(cache_file, repo)
+    return repo, errors
@@ -1,68 +1,121 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import os
+from functools import partial
+
 from connect.reports.constants import DEFAULT_RENDERER_ID
 from connect.reports.datamodels import (
     ChoicesParameterDefinition,
+    LazyReportList,
     ParameterDefinition,
     RendererDefinition,
     ReportDefinition,
     RepositoryDefinition,
+    read_description,
+    slotted,
 )
 
 
-def parse(root_path, data):
+def _get_model(cls, slots):
+    return slotted(cls) if slots else cls
+
+
+def _preload_descriptions(root_path, data):
+    readme_files = [data['readme_file']] + [
+        report['readme_file'] for report in data['reports']
+    ]
+    for readme_file in readme_files:
+        try:
+            read_description(os.path.join(root_path, readme_file))
+        except OSError:
+            # missing readme files are reported by validation
+            pass
+
+
+def parse_report(root_path, data, slots=False):
+    """
+    Creates and returns a ReportDefinition object.
+
+    :param root_path: Reports descriptor root path.
+    :type root_path: str
+    :param data: Report content within the reports descriptor.
+    :type data: dict
+    :param slots: Use the slotted datamodels.
+    :type slots: bool
+    :returns: A report definition object.
+    :rtype: ReportDefinition
+    """
+    report = dict(data)
+    parameters_definitions = []
+    for param in report.pop('parameters'):
+        cls = ChoicesParameterDefinition if 'choices' in param else ParameterDefinition
+        parameters_definitions.append(_get_model(cls, slots)(**param))
+
+    renderer_cls = _get_model(RendererDefinition, slots)
+    if report['report_spec'] == '1':
+        default_renderer = DEFAULT_RENDERER_ID
+        template = report.pop('template')
+        start_row = report.pop('start_row')
+        start_col = report.pop('start_col')
+        renderers_definitions = [
+            renderer_cls(
+                root_path=root_path,
+                id=default_renderer,
+                type='xlsx',
+                description='Render report to Excel.',
+                default=True,
+                template=template,
+                args={
+                    'start_row': start_row,
+                    'start_col': start_col,
+                }),
+        ]
+    if report['report_spec'] == '2':
+        renderers_definitions = [
+            renderer_cls(root_path=root_path, **renderer)
+            for renderer in report.pop('renderers')
+        ]
+
+    return _get_model(ReportDefinition, slots)(
+        root_path=root_path,
+        parameters=parameters_definitions,
+        renderers=renderers_definitions,
+        **report,
+    )
+
+
+def parse(root_path, data, lazy=False, slots=False, preload_descriptions=False):
     """
     Creates and returns a RepositoryDefinition object.
 
     :param root_path: Reports descriptor root path.
     :type root_path: str
-    :param data: Reports descriptor content.
+    :param data: Reports descriptor content, it is not modified.
     :type data: dict
+    :param lazy: Parse each report on first access instead of upfront.
+    :type lazy: bool
+    :param slots: Use the slotted datamodels, which need less memory.
+    :type slots: bool
+    :param preload_descriptions: Read all the readme files into the description cache.
+    :type preload_descriptions: bool
     :returns: A repository definition object.
     :rtype: RepositoryDefinition
     """
+    if preload_descriptions:
+        _preload_descriptions(root_path, data)
+    data = dict(data)
     reports = data.pop('reports')
-    reports_definitions = []
-    for report in reports:
-        parameters_definitions = []
-        for param in report.pop('parameters'):
-            cls = ChoicesParameterDefinition if 'choices' in param else ParameterDefinition
-            parameters_definitions.append(cls(**param))
-
-        if report['report_spec'] == '1':
-            default_renderer = DEFAULT_RENDERER_ID
-            template = report.pop('template')
-            start_row = report.pop('start_row')
-            start_col = report.pop('start_col')
-            renderers_definitions = [
-                RendererDefinition(
-                    root_path=root_path,
-                    id=default_renderer,
-                    type='xlsx',
-                    description='Render report to Excel.',
-                    default=True,
-                    template=template,
-                    args={
-                        'start_row': start_row,
-                        'start_col': start_col,
-                    }),
-            ]
-        if report['report_spec'] == '2':
-            renderers_definitions = [
-                RendererDefinition(root_path=root_path, **renderer)
-                for renderer in report.pop('renderers')
-            ]
-
-        reports_definitions.append(
-            ReportDefinition(
-                root_path=root_path,
-                parameters=parameters_definitions,
-                renderers=renderers_definitions,
-                **report,
-            ),
+    if lazy:
+        reports_definitions = LazyReportList(
+            reports,
+            partial(parse_report, root_path, slots=slots),
         )
+    else:
+        reports_definitions = [
+            parse_report(root_path, report, slots=slots) for report in reports
+        ]
 
-    return RepositoryDefinition(
+    return _get_model(RepositoryDefinition, slots)(
         root_path=root_path,
         reports=reports_definitions,
         **data,
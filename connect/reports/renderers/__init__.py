@@ -1,12 +1,39 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
-from connect.reports.renderers.csv import CSVRenderer  # noqa
-from connect.reports.renderers.j2 import Jinja2Renderer  # noqa
-from connect.reports.renderers.json import JSONRenderer  # noqa
-from connect.reports.renderers.pdf import PDFRenderer  # noqa
+import importlib
+
 from connect.reports.renderers.registry import (  # noqa
     get_renderer,
     get_renderer_class,
     get_renderers,
+    register_lazy,
 )
-from connect.reports.renderers.xlsx import XLSXRenderer  # noqa
+
+
+# Renderers pull in heavy dependencies (WeasyPrint, openpyxl, Jinja2...):
+# they are imported on first access.
+_LAZY_ATTRIBUTES = {
+    'BatchRenderer': 'connect.reports.renderers.batch',
+    'RenderJob': 'connect.reports.renderers.batch',
+    'RenderResult': 'connect.reports.renderers.batch',
+    'render_batch': 'connect.reports.renderers.batch',
+    'render_batch_async': 'connect.reports.renderers.batch',
+    'CSVRenderer': 'connect.reports.renderers.csv',
+    'Jinja2Renderer': 'connect.reports.renderers.j2',
+    'JSONRenderer': 'connect.reports.renderers.json',
+    'NDJSONRenderer': 'connect.reports.renderers.ndjson',
+    'ParquetRenderer': 'connect.reports.renderers.parquet',
+    'PDFRenderer': 'connect.reports.renderers.pdf',
+    'XLSXRenderer': 'connect.reports.renderers.xlsx',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(importlib.import_module(module), name)
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
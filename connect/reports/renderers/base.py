@@ -2,17 +2,66 @@
 
 import asyncio
 import contextlib
+import inspect
 import json
 import os
 import shutil
 import tempfile
+import uuid
 import zipfile
+import zlib
 from abc import ABCMeta, abstractmethod
+from collections.abc import Iterable
 from datetime import datetime
 from functools import partial
 
 import pytz
 
+from connect.reports.renderers.executor import get_default_executor
+from connect.reports.renderers.utils import (
+    DEFAULT_PREFETCH_BATCH_SIZE,
+    DEFAULT_PREFETCH_BATCHES,
+    aiter,
+)
+
+
+PACK_COMPRESSIONS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflated': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+
+PACK_COMPRESSLEVELS = {
+    'deflated': range(0, 10),
+    'bzip2': range(1, 10),
+}
+
+COMPRESSED_SAMPLE_SIZE = 64 * 1024
+
+MATERIALIZED_TYPES = (list, tuple, dict, str, bytes, bytearray)
+
+
+def is_compressed(path):
+    """
+    Guesses if a file is already compressed trying to deflate
+    a sample of its content.
+    """
+    with open(path, 'rb') as fp:
+        sample = fp.read(COMPRESSED_SAMPLE_SIZE)
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) > len(sample) * 0.9
+
+
+def render_in_process(renderer_cls, init_kwargs, extra_context, data, output_file, start_time):
+    """
+    Creates the renderer and renders the report within a worker process.
+    """
+    renderer = renderer_cls(**init_kwargs)
+    renderer.set_extra_context(extra_context)
+    return renderer.render(data, output_file, start_time=start_time)
+
 
 @contextlib.contextmanager
 def temp_dir():
@@ -40,11 +89,24 @@ class BaseRenderer(metaclass=ABCMeta):
     :type report: Report
     :param template: Template name.
     :type template: str
-    :param args: Renderer required arguments.
+    :param args: Renderer required arguments. The pack file can be tuned
+                 with `pack_compression` (stored, deflated, bzip2 or lzma),
+                 `pack_compresslevel` and `pack_store_compressed` (store
+                 the entries that are already compressed). With
+                 `pack_streaming` renderers able to do it write the report
+                 straight into the pack file, unless `pack_store_compressed`
+                 is set too.
     :type args: dict
     :param extra_context: Additional context data
                         for report rendering.
     :type extra_context: dict
+    :param executor: Executor for the blocking calls of the async
+                     rendering, the module-level report executor
+                     by default.
+    :type executor: concurrent.futures.Executor
+    :param process_executor: Process pool executor; when given, `render_async`
+                             renders the whole report in a worker process.
+    :type process_executor: concurrent.futures.ProcessPoolExecutor
     """
     def __init__(
         self,
@@ -54,6 +116,8 @@ class BaseRenderer(metaclass=ABCMeta):
         report,
         template=None,
         args=None,
+        executor=None,
+        process_executor=None,
     ):
         self.environment = environment
         self.root_dir = root_dir
@@ -61,6 +125,8 @@ class BaseRenderer(metaclass=ABCMeta):
         self.report = report
         self.template = template
         self.args = args or {}
+        self.executor = executor
+        self.process_executor = process_executor
         self.extra_context = None
         self.current_working_directory = None
 
@@ -89,32 +155,156 @@ class BaseRenderer(metaclass=ABCMeta):
         :type start_time: datetime
         """
         start_time = start_time or datetime.now(tz=pytz.utc)
+        if self.is_pack_streaming():
+            return self.render_stream(data, output_file, start_time)
         with temp_dir() as tmpdir:
             self.current_working_directory = tmpdir
             report_file = self.generate_report(data, f'{tmpdir}/report')
-            summary_file = self.generate_summary(f'{tmpdir}/summary', start_time)
-            pack_file = self.pack_files(report_file, summary_file, output_file)
+            compression = self.get_pack_compression(report_file)
+            summary_file = self.generate_summary(f'{tmpdir}/summary', start_time, compression)
+            pack_file = self.pack_files(report_file, summary_file, output_file, compression)
         return pack_file
 
     async def render_async(self, data, output_file, start_time=None):
         start_time = start_time or datetime.now(tz=pytz.utc)
+        if self.process_executor is not None:
+            return await self.render_in_process_async(data, output_file, start_time)
+        if self.is_pack_streaming():
+            return await self.render_stream_async(data, output_file, start_time)
         with temp_dir() as tmpdir:
             self.current_working_directory = tmpdir
             report_file = await self.generate_report_async(data, f'{tmpdir}/report')
-            summary_file = await self.generate_summary_async(f'{tmpdir}/summary', start_time)
-            pack_file = await self.pack_files_async(report_file, summary_file, output_file)
+            compression = await self._to_thread(self.get_pack_compression, report_file)
+            summary_file = await self.generate_summary_async(
+                f'{tmpdir}/summary', start_time, compression,
+            )
+            pack_file = await self.pack_files_async(
+                report_file, summary_file, output_file, compression,
+            )
         return pack_file
 
-    def generate_summary(self, output_file, start_time):
+    async def render_in_process_async(self, data, output_file, start_time):
         """
-        Generates summary information of report generation.
+        Renders the report in a worker process of the process executor.
+        Iterables other than lists, tuples, dicts, strings and bytes
+        are materialized into a list before being sent to the worker.
+
+        :param data: Report information.
+        :type data: dict
+        :param output_file: Output file name.
+        :type output_file: str
+        :param start_time: Start time information.
+        :type start_time: datetime
+        """
+        if hasattr(data, '__aiter__'):
+            data = [item async for item in data]
+        elif isinstance(data, Iterable) and not isinstance(data, MATERIALIZED_TYPES):
+            # iterators, cursors and other lazy sources
+            # cannot be sent to the worker as they are
+            data = await self._to_thread(list, data)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.process_executor,
+            partial(
+                render_in_process,
+                type(self),
+                self.get_init_kwargs(),
+                self.extra_context,
+                data,
+                output_file,
+                start_time,
+            ),
+        )
+
+    def get_init_kwargs(self):
+        """
+        Returns the arguments needed to create a copy of
+        this renderer within another process.
+        """
+        return {
+            'environment': self.environment,
+            'root_dir': self.root_dir,
+            'account': self.account,
+            'report': self.report,
+            'template': self.template,
+            'args': self.args,
+        }
 
+    def is_pack_streaming(self):
+        # telling if the report is compressed needs the whole file,
+        # `pack_store_compressed` falls back to the file based render.
+        return (
+            self.args.get('pack_streaming', False)
+            and not self.args.get('pack_store_compressed', False)
+            and self.get_stream_entry_name() is not None
+        )
+
+    def render_stream(self, data, output_file, start_time):
+        """
+        Creates the report pack file writing the report straight into
+        the archive entry, the summary entry is appended last.
+        The archive is written to a temporary file renamed to the
+        output file once complete, it is removed if the render fails.
+
+        :param data: Report information.
+        :type data: dict
         :param output_file: Output file name.
         :type output_file: str
         :param start_time: Start time information.
         :type start_time: datetime
         """
-        data = {
+        output_file = self._get_pack_file_name(output_file)
+        with self._open_pack_file_atomic(output_file) as repzip:
+            with repzip.open(self.get_stream_entry_name(), 'w', force_zip64=True) as stream:
+                self.generate_report_stream(data, stream)
+            repzip.writestr('summary.json', self._dump_summary(start_time))
+        return output_file
+
+    async def render_stream_async(self, data, output_file, start_time):
+        output_file = self._get_pack_file_name(output_file)
+        with self._open_pack_file_atomic(output_file) as repzip:
+            with repzip.open(self.get_stream_entry_name(), 'w', force_zip64=True) as stream:
+                await self.generate_report_stream_async(data, stream)
+            await self._to_thread(
+                repzip.writestr, 'summary.json', self._dump_summary(start_time),
+            )
+        return output_file
+
+    def get_stream_entry_name(self):
+        """
+        Returns the name of the report entry within the pack file
+        for renderers that support the streaming render, None otherwise.
+        """
+        return None
+
+    def generate_report_stream(self, data, stream):
+        """
+        Method to be implemented by the renderers that support the streaming render.
+        Writes the report into a binary stream.
+
+        :param data: Report information.
+        :type data: dict
+        :param stream: Writable binary stream.
+        :type stream: io.RawIOBase
+        """
+        raise NotImplementedError('Subclasses must implement the `generate_report_stream` method.')
+
+    async def generate_report_stream_async(self, data, stream):
+        raise NotImplementedError(
+            'Subclasses must implement the `generate_report_stream_async` method.',
+        )
+
+    def get_summary(self, start_time, compression=None):
+        """
+        Returns summary information of report generation.
+
+        :param start_time: Start time information.
+        :type start_time: datetime
+        :param compression: Compression method the report is packed with.
+        :type compression: str
+        """
+        compression = compression or self.get_pack_compression()
+        return {
             'title': 'Report Execution Information',
             'data': {
                 'report_start_time': start_time.isoformat(),
@@ -125,30 +315,125 @@ class BaseRenderer(metaclass=ABCMeta):
                 'report_name': self.report.name,
                 'runtime_environment': self.environment,
                 'report_execution_parameters': self.report.values,
+                'report_pack_compression': {
+                    'method': compression,
+                    'level': (
+                        None if compression == 'stored'
+                        else self.args.get('pack_compresslevel')
+                    ),
+                },
             },
         }
+
+    def generate_summary(self, output_file, start_time, compression=None):
+        """
+        Generates summary information of report generation.
+
+        :param output_file: Output file name.
+        :type output_file: str
+        :param start_time: Start time information.
+        :type start_time: datetime
+        :param compression: Compression method the report is packed with.
+        :type compression: str
+        """
         output_file = f'{output_file}.json'
-        json.dump(data, open(output_file, 'w'), indent=4, sort_keys=True)
+        with open(output_file, 'w') as fp:
+            fp.write(self._dump_summary(start_time, compression))
         return output_file
 
-    async def generate_summary_async(self, output_file, start_time):
-        return await self._to_thread(self.generate_summary, output_file, start_time)
+    def _dump_summary(self, start_time, compression=None):
+        return json.dumps(self.get_summary(start_time, compression), indent=4, sort_keys=True)
+
+    async def generate_summary_async(self, output_file, start_time, compression=None):
+        return await self._to_thread(
+            self.generate_summary, output_file, start_time, compression,
+        )
+
+    def get_pack_compression(self, file_path=None):
+        """
+        Returns the compression method to pack a file with.
+
+        :param file_path: File to pack.
+        :type file_path: str
+        :returns: The compression method name.
+        :rtype: str
+        """
+        if (
+            file_path
+            and self.args.get('pack_store_compressed', False)
+            and is_compressed(file_path)
+        ):
+            return 'stored'
+        return self.args.get('pack_compression', 'deflated')
 
-    def pack_files(self, report_file, summary_file, output_file):
+    def _get_pack_file_name(self, output_file):
         tokens = output_file.split('.')
         if tokens[-1] != 'zip':
             output_file = f'{tokens[0]}.zip'
-        with zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_DEFLATED) as repzip:
-            repzip.write(report_file, os.path.basename(report_file))
-            repzip.write(summary_file, os.path.basename(summary_file))
         return output_file
 
-    async def pack_files_async(self, report_file, summary_file, output_file):
-        return await self._to_thread(self.pack_files, report_file, summary_file, output_file)
+    def _open_pack_file(self, output_file, mode='w'):
+        return zipfile.ZipFile(
+            output_file,
+            mode,
+            compression=PACK_COMPRESSIONS[self.get_pack_compression()],
+            compresslevel=self.args.get('pack_compresslevel'),
+        )
+
+    @contextlib.contextmanager
+    def _open_pack_file_atomic(self, output_file):
+        tmp_file = f'{output_file}.{uuid.uuid4().hex[:8]}.tmp'
+        try:
+            with self._open_pack_file(tmp_file, mode='x') as repzip:
+                yield repzip
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_file)
+            raise
+
+    def pack_files(self, report_file, summary_file, output_file, compression=None):
+        output_file = self._get_pack_file_name(output_file)
+        compressions = (
+            compression or self.get_pack_compression(report_file),
+            self.get_pack_compression(),
+        )
+        with self._open_pack_file(output_file) as repzip:
+            for file_path, method in zip((report_file, summary_file), compressions):
+                repzip.write(
+                    file_path,
+                    os.path.basename(file_path),
+                    compress_type=PACK_COMPRESSIONS[method],
+                )
+        return output_file
+
+    async def pack_files_async(self, report_file, summary_file, output_file, compression=None):
+        return await self._to_thread(
+            self.pack_files, report_file, summary_file, output_file, compression,
+        )
+
+    def get_async_iterator(self, data):
+        """
+        Returns an async iterator over the report data.
+        Sync iterables are consumed through the renderer executor in batches
+        of `prefetch_batch_size` items, `prefetch_batches` ahead at most.
+        """
+        if inspect.isasyncgen(data):
+            return data
+        return aiter(
+            data,
+            batch_size=self.args.get('prefetch_batch_size', DEFAULT_PREFETCH_BATCH_SIZE),
+            prefetch=self.args.get('prefetch_batches', DEFAULT_PREFETCH_BATCHES),
+            executor=self.executor,
+        )
 
     async def _to_thread(self, func, *args, **kwargs):
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, partial(func, **kwargs), *args)
+        return await loop.run_in_executor(
+            self.executor or get_default_executor(),
+            partial(func, **kwargs),
+            *args,
+        )
 
     @abstractmethod
     def generate_report(self, data, output_file):
@@ -176,6 +461,43 @@ class BaseRenderer(metaclass=ABCMeta):
         """
         raise NotImplementedError('Subclasses must implement the `generate_report_async` method.')
 
+    @classmethod
+    def _validate_pack_args(cls, args):
+        errors = []
+        compression = args.get('pack_compression', 'deflated')
+        if compression not in PACK_COMPRESSIONS:
+            errors.append(
+                f'`pack_compression` must be one of {", ".join(PACK_COMPRESSIONS)}.',
+            )
+        compresslevel = args.get('pack_compresslevel')
+        if compresslevel is not None and compression in PACK_COMPRESSIONS:
+            levels = PACK_COMPRESSLEVELS.get(compression)
+            if not levels or compresslevel not in levels:
+                errors.append(
+                    f'`pack_compresslevel` is not valid for `{compression}` compression.',
+                )
+        for option in ('pack_store_compressed', 'pack_streaming'):
+            value = args.get(option)
+            if value is not None and not isinstance(value, bool):
+                errors.append(f'`{option}` must be boolean.')
+        if args.get('pack_streaming') is True and args.get('pack_store_compressed') is True:
+            errors.append('`pack_store_compressed` cannot be used with `pack_streaming`.')
+        return errors
+
+    @classmethod
+    def _validate_prefetch_args(cls, args):
+        errors = []
+        for option in ('prefetch_batch_size', 'prefetch_batches'):
+            value = args.get(option)
+            if value is not None and (not isinstance(value, int) or value < 1):
+                errors.append(f'`{option}` must be a positive integer.')
+        return errors
+
     @classmethod
     def validate(cls, definition):
+        if definition.args is not None:
+            return (
+                cls._validate_pack_args(definition.args)
+                + cls._validate_prefetch_args(definition.args)
+            )
         return []
@@ -0,0 +1,194 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List
+
+from connect.reports.datamodels import Account, Report
+from connect.reports.renderers.registry import get_renderer_class
+
+
+DEFAULT_CONCURRENCY = 4
+
+
+@dataclass
+class RenderJob:
+    """
+    Single report rendering within a batch.
+
+    :param account: Owner account.
+    :type account: Account
+    :param report: Report object.
+    :type report: Report
+    :param data: Report information.
+    :type data: Any
+    :param output_file: Output file name.
+    :type output_file: str
+    :param start_time: Start time information.
+    :type start_time: datetime
+    :param extra_context: Additional context data for report rendering.
+    :type extra_context: dict
+    """
+    account: Account
+    report: Report
+    data: Any
+    output_file: str
+    start_time: datetime = None
+    extra_context: Dict[str, Any] = None
+
+
+@dataclass
+class RenderResult:
+    """
+    Outcome of a render job.
+
+    :param job: Render job.
+    :type job: RenderJob
+    :param output_file: Generated file, None if the job failed.
+    :type output_file: str
+    :param error: Raised exception, None if the job succeeded.
+    :type error: Exception
+    """
+    job: RenderJob
+    output_file: str = None
+    error: Exception = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchRenderer:
+    """
+    Renders the same report definition for many jobs, sharing
+    the renderer class lookup and the template state
+    (Jinja2 environments, asset caches) across them.
+
+    :param name: Renderer type.
+    :type name: str
+    :param environment: Runtime environment.
+    :type environment: str
+    :param project_dir: Base root dir.
+    :type project_dir: str
+    :param template: Template name.
+    :type template: str
+    :param args: Renderer required arguments.
+    :type args: dict
+    :param concurrency: Maximum number of jobs rendered at the same time.
+    :type concurrency: int
+    :param executor: Executor for the async renderers blocking calls.
+    :type executor: concurrent.futures.Executor
+    :param process_executor: Process pool executor for the async renderers.
+    :type process_executor: concurrent.futures.ProcessPoolExecutor
+    """
+    def __init__(
+        self,
+        name,
+        environment,
+        project_dir,
+        template=None,
+        args=None,
+        concurrency=DEFAULT_CONCURRENCY,
+        executor=None,
+        process_executor=None,
+    ):
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise ValueError('`concurrency` must be a positive integer.')
+        self.renderer_cls = get_renderer_class(name)
+        self.environment = environment
+        self.project_dir = project_dir
+        self.template = template
+        self.args = args
+        self.concurrency = concurrency
+        self.executor = executor
+        self.process_executor = process_executor
+
+    def get_renderer(self, job):
+        renderer = self.renderer_cls(
+            self.environment,
+            self.project_dir,
+            job.account,
+            job.report,
+            self.template,
+            self.args,
+            executor=self.executor,
+            process_executor=self.process_executor,
+        )
+        renderer.set_extra_context(job.extra_context)
+        return renderer
+
+    def render_job(self, job):
+        try:
+            output_file = self.get_renderer(job).render(
+                job.data, job.output_file, start_time=job.start_time,
+            )
+        except Exception as e:
+            return RenderResult(job=job, error=e)
+        return RenderResult(job=job, output_file=output_file)
+
+    async def render_job_async(self, job, semaphore):
+        async with semaphore:
+            try:
+                output_file = await self.get_renderer(job).render_async(
+                    job.data, job.output_file, start_time=job.start_time,
+                )
+            except Exception as e:
+                return RenderResult(job=job, error=e)
+        return RenderResult(job=job, output_file=output_file)
+
+    def render(self, jobs) -> List[RenderResult]:
+        """
+        Renders the jobs in a thread pool of `concurrency` workers.
+
+        :param jobs: List of RenderJob or (account, report, data, output_file) tuples.
+        :type jobs: list
+        :returns: A result for each job, in the same order.
+        :rtype: list
+        """
+        jobs = _get_jobs(jobs)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(self.render_job, jobs))
+
+    async def render_async(self, jobs) -> List[RenderResult]:
+        """
+        Renders the jobs concurrently, at most `concurrency` at the same time.
+
+        :param jobs: List of RenderJob or (account, report, data, output_file) tuples.
+        :type jobs: list
+        :returns: A result for each job, in the same order.
+        :rtype: list
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(
+            *[self.render_job_async(job, semaphore) for job in _get_jobs(jobs)],
+        )
+
+
+def _get_jobs(jobs):
+    return [job if isinstance(job, RenderJob) else RenderJob(*job) for job in jobs]
+
+
+def render_batch(name, environment, project_dir, jobs, template=None, args=None, **kwargs):
+    """
+    Renders many reports with the same renderer definition.
+
+    :returns: A list of RenderResult, in the same order as the jobs.
+    :rtype: list
+    """
+    batch = BatchRenderer(name, environment, project_dir, template, args, **kwargs)
+    return batch.render(jobs)
+
+
+async def render_batch_async(
+    name, environment, project_dir, jobs, template=None, args=None, **kwargs,
+):
+    """
+    Renders many reports with the same renderer definition asynchronously.
+
+    :returns: A list of RenderResult, in the same order as the jobs.
+    :rtype: list
+    """
+    batch = BatchRenderer(name, environment, project_dir, template, args, **kwargs)
+    return await batch.render_async(jobs)
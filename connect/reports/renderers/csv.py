@@ -1,11 +1,15 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import asyncio
 import csv
-import inspect
+import io
 
 from connect.reports.renderers.base import BaseRenderer
 from connect.reports.renderers.registry import register
-from connect.reports.renderers.utils import aiter
+from connect.reports.renderers.utils import achunks, text_stream
+
+
+DEFAULT_CHUNK_SIZE = 1000
 
 
 @register('csv')
@@ -15,15 +19,19 @@ class CSVRenderer(BaseRenderer):
     Inherits from BaseRenderer class and implements
     the generation report function, exporting the data
     to a CSV file.
+
+    The async generation groups rows into chunks of `chunk_size`
+    rows (renderer argument), serializes every chunk into an
+    in-memory buffer and writes it within the executor. Only one
+    buffer write is pending at a time, so a slow disk holds the
+    producer back instead of piling up buffers.
     """
     def generate_report(self, data, output_file):
         tokens = output_file.split('.')
         if tokens[-1] != 'csv':
             output_file = f'{tokens[0]}.csv'
         with open(output_file, 'w') as fp:
-            writer = csv.writer(fp, delimiter=';', quotechar='"', quoting=csv.QUOTE_ALL)
-            for row in data:
-                writer.writerow(row)
+            self._write_rows(data, fp)
         return output_file
 
     async def generate_report_async(self, data, output_file):
@@ -31,9 +39,52 @@ class CSVRenderer(BaseRenderer):
         if tokens[-1] != 'csv':
             output_file = f'{tokens[0]}.csv'
         with open(output_file, 'w') as fp:
-            writer = csv.writer(fp, delimiter=';', quotechar='"', quoting=csv.QUOTE_ALL)
-            if not inspect.isasyncgen(data):
-                data = aiter(data)
-            async for row in data:
-                await self._to_thread(writer.writerow, row)
+            await self._write_rows_async(data, fp)
         return output_file
+
+    def get_stream_entry_name(self):
+        return 'report.csv'
+
+    def generate_report_stream(self, data, stream):
+        with text_stream(stream) as fp:
+            self._write_rows(data, fp)
+
+    async def generate_report_stream_async(self, data, stream):
+        with text_stream(stream) as fp:
+            await self._write_rows_async(data, fp)
+
+    def _write_rows(self, data, fp):
+        writer = csv.writer(fp, delimiter=';', quotechar='"', quoting=csv.QUOTE_ALL)
+        for row in data:
+            writer.writerow(row)
+
+    async def _write_rows_async(self, data, fp):
+        chunk_size = self.args.get('chunk_size', DEFAULT_CHUNK_SIZE)
+        data = self.get_async_iterator(data)
+        pending_write = None
+        try:
+            async for chunk in achunks(data, chunk_size):
+                buffer = self._serialize_rows(chunk)
+                if pending_write:
+                    await pending_write
+                pending_write = asyncio.ensure_future(self._to_thread(fp.write, buffer))
+        finally:
+            if pending_write:
+                await pending_write
+
+    def _serialize_rows(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';', quotechar='"', quoting=csv.QUOTE_ALL)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    @classmethod
+    def validate(cls, definition):
+        errors = super(CSVRenderer, cls).validate(definition)
+        if definition.args is not None:
+            chunk_size = definition.args.get('chunk_size')
+            if chunk_size is not None and (
+                not isinstance(chunk_size, int) or chunk_size < 1
+            ):
+                errors.append('`chunk_size` must be a positive integer.')
+        return errors
@@ -0,0 +1,122 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+class ReportExecutor(Executor):
+    """
+    Executor used by the renderers for blocking calls.
+    Wraps a thread (or process) pool executor collecting
+    queue depth and task latency metrics.
+
+    Renderers submit calls bound to open files, so a thread
+    pool is required for the I/O of the built-in renderers.
+
+    :param executor: Wrapped executor, a thread pool
+                     with `max_workers` threads by default.
+    :type executor: concurrent.futures.Executor
+    :param max_workers: Maximum workers of the default pool.
+    :type max_workers: int
+    """
+    def __init__(self, executor=None, max_workers=DEFAULT_MAX_WORKERS):
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='connect-reports',
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            self._pending += 1
+            self._max_pending = max(self._max_pending, self._pending)
+        submitted_at = time.monotonic()
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda f: self._task_done(f, submitted_at))
+        return future
+
+    def _task_done(self, future, submitted_at):
+        latency = time.monotonic() - submitted_at
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+
+    def get_metrics(self):
+        """
+        Returns the executor metrics.
+
+        :returns: Current queue depth (`pending`), its peak (`max_pending`),
+                  completed and failed tasks and task latency (from
+                  submission to completion) in seconds.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'max_pending': self._max_pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'avg_latency': (
+                    self._total_latency / self._completed if self._completed else 0.0
+                ),
+                'max_latency': self._max_latency,
+            }
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_executor():
+    """
+    Returns the module-level executor shared by the renderers
+    that have not been given an executor.
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ReportExecutor()
+        return _default_executor
+
+
+def configure_default_executor(executor=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Replaces the module-level executor shutting down the previous one.
+
+    :param executor: Executor to wrap.
+    :type executor: concurrent.futures.Executor
+    :param max_workers: Maximum workers of the default pool.
+    :type max_workers: int
+    :returns: The new default executor.
+    :rtype: ReportExecutor
+    """
+    global _default_executor
+    with _default_executor_lock:
+        previous = _default_executor
+        _default_executor = ReportExecutor(executor=executor, max_workers=max_workers)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _default_executor
@@ -1,11 +1,99 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
 import os
+import threading
+from collections import OrderedDict
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
 
 from connect.reports.renderers.base import BaseRenderer
 from connect.reports.renderers.registry import register
+from connect.reports.renderers.utils import text_stream
+
+
+DEFAULT_ENVIRONMENT_CACHE_SIZE = 64
+ASYNC_BYTECODE_CACHE_PATTERN = '__jinja2_async_%s.cache'
+
+
+class EnvironmentCache:
+    """
+    Process-wide LRU cache of Jinja2 environments keyed by
+    template directory and async flag.
+    Compiled templates are kept by each environment and reloaded
+    when the template file modification time changes.
+
+    :param max_size: Maximum number of cached environments.
+    :type max_size: int
+    :param bytecode_cache_dir: Optional directory for the on-disk
+                               Jinja2 bytecode cache.
+    :type bytecode_cache_dir: str
+    """
+    def __init__(self, max_size=DEFAULT_ENVIRONMENT_CACHE_SIZE, bytecode_cache_dir=None):
+        self.max_size = max_size
+        self.bytecode_caches = {False: None, True: None}
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            # bytecode is keyed by template name only while the sync
+            # and async compilations differ: keep them in distinct files.
+            self.bytecode_caches = {
+                False: FileSystemBytecodeCache(bytecode_cache_dir),
+                True: FileSystemBytecodeCache(
+                    bytecode_cache_dir, pattern=ASYNC_BYTECODE_CACHE_PATTERN,
+                ),
+            }
+        self._environments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_dir, enable_async=False):
+        key = (os.path.abspath(template_dir), enable_async)
+        with self._lock:
+            env = self._environments.get(key)
+            if env is not None:
+                self._environments.move_to_end(key)
+                return env
+            env = Environment(
+                loader=FileSystemLoader(template_dir),
+                autoescape=select_autoescape(['html', 'xml']),
+                enable_async=enable_async,
+                auto_reload=True,
+                bytecode_cache=self.bytecode_caches[enable_async],
+            )
+            self._environments[key] = env
+            if len(self._environments) > self.max_size:
+                self._environments.popitem(last=False)
+            return env
+
+    def clear(self):
+        with self._lock:
+            self._environments.clear()
+
+    def __len__(self):
+        return len(self._environments)
+
+
+environment_cache = EnvironmentCache()
+
+
+def configure_environment_cache(max_size=DEFAULT_ENVIRONMENT_CACHE_SIZE, bytecode_cache_dir=None):
+    """
+    Replaces the process-wide Jinja2 environment cache.
+
+    :param max_size: Maximum number of cached environments.
+    :type max_size: int
+    :param bytecode_cache_dir: Optional directory for the on-disk
+                               Jinja2 bytecode cache.
+    :type bytecode_cache_dir: str
+    """
+    global environment_cache
+    environment_cache = EnvironmentCache(
+        max_size=max_size,
+        bytecode_cache_dir=bytecode_cache_dir,
+    )
 
 
 @register('jinja2')
@@ -16,30 +104,22 @@ class Jinja2Renderer(BaseRenderer):
     the generation report function, exporting the data
     to a j2 file.
     """
-    def generate_report(self, data, output_file):
+    def get_template(self, enable_async=False):
         path, name = self.template.rsplit('/', 1)
-        loader = FileSystemLoader(os.path.join(self.root_dir, path))
-        env = Environment(
-            loader=loader,
-            autoescape=select_autoescape(['html', 'xml']),
-        )
-        template = env.get_template(name)
-        _, ext, _ = name.rsplit('.', 2)
+        env = environment_cache.get(os.path.join(self.root_dir, path), enable_async)
+        return env.get_template(name)
+
+    def generate_report(self, data, output_file):
+        template = self.get_template()
+        _, ext, _ = template.name.rsplit('.', 2)
 
         report_file = f'{output_file}.{ext}'
         template.stream(self.get_context(data)).dump(open(report_file, 'w'))
         return report_file
 
     async def generate_report_async(self, data, output_file):
-        path, name = self.template.rsplit('/', 1)
-        loader = FileSystemLoader(os.path.join(self.root_dir, path))
-        env = Environment(
-            loader=loader,
-            autoescape=select_autoescape(['html', 'xml']),
-            enable_async=True,
-        )
-        template = env.get_template(name)
-        _, ext, _ = name.rsplit('.', 2)
+        template = self.get_template(enable_async=True)
+        _, ext, _ = template.name.rsplit('.', 2)
 
         report_file = f'{output_file}.{ext}'
         with open(report_file, 'w') as writer:
@@ -48,9 +128,23 @@ class Jinja2Renderer(BaseRenderer):
 
         return report_file
 
+    def get_stream_entry_name(self):
+        _, ext, _ = self.template.rsplit('.', 2)
+        return f'report.{ext}'
+
+    def generate_report_stream(self, data, stream):
+        with text_stream(stream) as writer:
+            self.get_template().stream(self.get_context(data)).dump(writer)
+
+    async def generate_report_stream_async(self, data, stream):
+        template = self.get_template(enable_async=True)
+        with text_stream(stream) as writer:
+            async for line in template.generate_async(self.get_context(data)):
+                await self._to_thread(writer.write, line)
+
     @classmethod
     def validate(cls, definition):
-        errors = []
+        errors = super(Jinja2Renderer, cls).validate(definition)
         if definition.template is None:
             errors.append('`template` is required for jinja2 renderer.')
         else:
@@ -1,7 +1,6 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
 import inspect
-import os
 
 import orjson
 
@@ -9,6 +8,45 @@ from connect.reports.renderers.base import BaseRenderer
 from connect.reports.renderers.registry import register
 
 
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class JSONArrayBuffer:
+    """
+    Accumulates the serialized items of a JSON array so they can
+    be written to the output in large blocks.
+    The separator is emitted before every item but the first one.
+
+    :param buffer_size: Size in bytes that triggers a flush.
+    :type buffer_size: int
+    """
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self._buffer_size = buffer_size
+        self._buffer = bytearray(b'[')
+        self._separator = b''
+
+    def add(self, item):
+        """
+        Appends an item to the buffer.
+
+        :returns: True if the buffer must be flushed.
+        :rtype: bool
+        """
+        self._buffer += self._separator
+        self._buffer += orjson.dumps(item)
+        self._separator = b','
+        return len(self._buffer) >= self._buffer_size
+
+    def flush(self):
+        content = bytes(self._buffer)
+        self._buffer.clear()
+        return content
+
+    def close(self):
+        self._buffer += b']'
+        return self.flush()
+
+
 @register('json')
 class JSONRenderer(BaseRenderer):
     """
@@ -16,49 +54,63 @@ class JSONRenderer(BaseRenderer):
     Inherits from BaseRenderer class and implements
     the generation report function, exporting the data
     to a JSON file.
+
+    Generators are streamed as a JSON array, writing the serialized
+    items in blocks of `buffer_size` bytes (renderer argument).
     """
     def generate_report(self, data, output_file):
         tokens = output_file.split('.')
         if tokens[-1] != 'json':
             output_file = f'{tokens[0]}.json'
-        if inspect.isgenerator(data):
-            has_data = False
-            with open(output_file, 'wb') as f:
-                f.write(b'[')
-                for item in data:
-                    has_data = True
-                    f.write(orjson.dumps(item))
-                    f.write(b',')
-            if has_data:
-                with open(output_file, 'rb+') as f:
-                    f.seek(-1, os.SEEK_END)
-                    f.truncate()
-            with open(output_file, 'a') as f:
-                f.write(']')
-        else:
-            with open(output_file, 'wb') as f:
-                f.write(orjson.dumps(data))
+        with open(output_file, 'wb') as f:
+            self._write_report(data, f)
         return output_file
 
     async def generate_report_async(self, data, output_file):
         tokens = output_file.split('.')
         if tokens[-1] != 'json':
             output_file = f'{tokens[0]}.json'
-        if inspect.isasyncgen(data):
-            has_data = False
-            with open(output_file, 'wb') as f:
-                await self._to_thread(f.write, b'[')
-                async for item in data:
-                    has_data = True
-                    await self._to_thread(f.write, orjson.dumps(item))
-                    await self._to_thread(f.write, b',')
-            if has_data:
-                with open(output_file, 'rb+') as f:
-                    await self._to_thread(f.seek, -1, os.SEEK_END)
-                    await self._to_thread(f.truncate)
-            with open(output_file, 'a') as f:
-                await self._to_thread(f.write, ']')
-        else:
-            with open(output_file, 'wb') as f:
-                await self._to_thread(f.write, orjson.dumps(data))
+        with open(output_file, 'wb') as f:
+            await self._write_report_async(data, f)
         return output_file
+
+    def get_stream_entry_name(self):
+        return 'report.json'
+
+    def generate_report_stream(self, data, stream):
+        self._write_report(data, stream)
+
+    async def generate_report_stream_async(self, data, stream):
+        await self._write_report_async(data, stream)
+
+    def _write_report(self, data, f):
+        if inspect.isgenerator(data):
+            buffer = JSONArrayBuffer(self.args.get('buffer_size', DEFAULT_BUFFER_SIZE))
+            for item in data:
+                if buffer.add(item):
+                    f.write(buffer.flush())
+            f.write(buffer.close())
+        else:
+            f.write(orjson.dumps(data))
+
+    async def _write_report_async(self, data, f):
+        if inspect.isasyncgen(data) or inspect.isgenerator(data):
+            data = self.get_async_iterator(data)
+            buffer = JSONArrayBuffer(self.args.get('buffer_size', DEFAULT_BUFFER_SIZE))
+            async for item in data:
+                if buffer.add(item):
+                    await self._to_thread(f.write, buffer.flush())
+            await self._to_thread(f.write, buffer.close())
+        else:
+            await self._to_thread(f.write, orjson.dumps(data))
+
+    @classmethod
+    def validate(cls, definition):
+        errors = super(JSONRenderer, cls).validate(definition)
+        if definition.args is not None:
+            buffer_size = definition.args.get('buffer_size')
+            if buffer_size is not None and (
+                not isinstance(buffer_size, int) or buffer_size < 1
+            ):
+                errors.append('`buffer_size` must be a positive integer.')
+        return errors
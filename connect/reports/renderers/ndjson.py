@@ -0,0 +1,117 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+import bz2
+import contextlib
+import gzip
+import inspect
+import lzma
+
+import orjson
+
+from connect.reports.renderers.base import BaseRenderer
+from connect.reports.renderers.json import DEFAULT_BUFFER_SIZE
+from connect.reports.renderers.registry import register
+
+
+COMPRESSIONS = {
+    'gzip': ('gz', gzip.open),
+    'bz2': ('bz2', bz2.open),
+    'xz': ('xz', lzma.open),
+}
+
+
+@register('ndjson')
+class NDJSONRenderer(BaseRenderer):
+    """
+    NDJSON Renderer class.
+    Inherits from BaseRenderer class and implements
+    the generation report function, exporting the data
+    to a newline delimited JSON file (one record per line).
+
+    The stream can be compressed setting the `compression`
+    renderer argument to one of `gzip`, `bz2` or `xz`.
+    """
+    def generate_report(self, data, output_file):
+        output_file = self._get_file_name(output_file)
+        with self._open(output_file) as fp:
+            self._write_records(data, fp)
+        return output_file
+
+    async def generate_report_async(self, data, output_file):
+        output_file = self._get_file_name(output_file)
+        with await self._to_thread(self._open, output_file) as fp:
+            await self._write_records_async(data, fp)
+        return output_file
+
+    def get_stream_entry_name(self):
+        return self._get_file_name('report')
+
+    def generate_report_stream(self, data, stream):
+        with self._open(stream) as fp:
+            self._write_records(data, fp)
+
+    async def generate_report_stream_async(self, data, stream):
+        with self._open(stream) as fp:
+            await self._write_records_async(data, fp)
+
+    def _write_records(self, data, fp):
+        buffer_size = self.args.get('buffer_size', DEFAULT_BUFFER_SIZE)
+        buffer = bytearray()
+        for item in self._get_records(data):
+            buffer += orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+            if len(buffer) >= buffer_size:
+                fp.write(buffer)
+                buffer.clear()
+        fp.write(buffer)
+
+    async def _write_records_async(self, data, fp):
+        buffer_size = self.args.get('buffer_size', DEFAULT_BUFFER_SIZE)
+        if not inspect.isasyncgen(data):
+            data = self.get_async_iterator(self._get_records(data))
+        buffer = bytearray()
+        async for item in data:
+            buffer += orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+            if len(buffer) >= buffer_size:
+                await self._to_thread(fp.write, bytes(buffer))
+                buffer.clear()
+        await self._to_thread(fp.write, bytes(buffer))
+
+    def _get_records(self, data):
+        if isinstance(data, dict):
+            return [data]
+        return data
+
+    def _get_file_name(self, output_file):
+        output_file = f'{output_file}.ndjson'
+        compression = self.args.get('compression')
+        if compression:
+            output_file = f'{output_file}.{COMPRESSIONS[compression][0]}'
+        return output_file
+
+    def _open(self, target):
+        """
+        Opens the output file, or wraps the output stream,
+        applying the configured compression.
+        """
+        compression = self.args.get('compression')
+        if compression:
+            return COMPRESSIONS[compression][1](target, 'wb')
+        if isinstance(target, str):
+            return open(target, 'wb')
+        return contextlib.nullcontext(target)
+
+    @classmethod
+    def validate(cls, definition):
+        errors = super(NDJSONRenderer, cls).validate(definition)
+        if definition.args is not None:
+            compression = definition.args.get('compression')
+            if compression is not None and compression not in COMPRESSIONS:
+                errors.append(
+                    f'`compression` must be one of {", ".join(COMPRESSIONS)}.',
+                )
+            buffer_size = definition.args.get('buffer_size')
+            if buffer_size is not None and (
+                not isinstance(buffer_size, int) or buffer_size < 1
+            ):
+                errors.append('`buffer_size` must be a positive integer.')
+        return errors
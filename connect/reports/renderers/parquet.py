@@ -0,0 +1,246 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+
+from connect.reports.renderers.base import BaseRenderer
+from connect.reports.renderers.registry import register
+from connect.reports.renderers.utils import achunks, chunks
+
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_MAX_PENDING_BATCHES = 10
+
+COMPRESSIONS = ('none', 'snappy', 'gzip', 'brotli', 'lz4', 'zstd')
+
+
+class RecordBatchBuilder:
+    """
+    Builds arrow record batches from chunks of rows.
+    Rows can be either lists (column names are taken from the
+    schema, the `columns` list or generated) or dicts.
+    When no schema is provided, it is inferred from the first
+    chunk and enforced on the following ones: columns with only
+    null values take the type of the first chunk with a value.
+    Values are cast safely, a value that cannot be represented
+    with the type of its column raises a `ValueError`, as do list
+    rows with a different number of values and dict rows with
+    unknown keys. List rows shorter than the schema or the `columns`
+    list are padded with null values.
+
+    :param schema: List of column definitions (`name` and `type`).
+    :type schema: list
+    :param columns: List of column names.
+    :type columns: list
+    :param max_pending: Number of batches kept while some columns
+                        have only null values before writing them
+                        with the `null` type.
+    :type max_pending: int
+    """
+    def __init__(self, schema=None, columns=None, max_pending=DEFAULT_MAX_PENDING_BATCHES):
+        self.schema = None
+        self.names = columns
+        self.declared = bool(schema or columns)
+        self.max_pending = max_pending
+        self.locked = False
+        self.pending = []
+        if schema:
+            self.schema = pa.schema(
+                [(column['name'], pa.type_for_alias(column['type'])) for column in schema],
+            )
+            self.names = self.schema.names
+            self.locked = True
+
+    def add(self, rows):
+        """
+        Builds a batch from `rows` and returns the batches ready to
+        be written with the builder schema, if any.
+        """
+        self.pending.append(self.build(rows))
+        if (
+            self.locked
+            or len(self.pending) >= self.max_pending
+            or not any(pa.types.is_null(field.type) for field in self.schema)
+        ):
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Returns the pending batches conformed to the builder schema,
+        that cannot change anymore.
+        """
+        self.locked = True
+        batches = [self._conform(batch) for batch in self.pending]
+        self.pending = []
+        return batches
+
+    def build(self, rows):
+        if isinstance(rows[0], dict):
+            self.names = self.names or list(rows[0].keys())
+            names = set(self.names)
+            for row in rows:
+                if not row.keys() <= names:
+                    unknown = ', '.join(sorted(map(str, row.keys() - names)))
+                    raise ValueError(f'unknown columns in row: {unknown}.')
+            columns = [[row.get(name) for row in rows] for name in self.names]
+        else:
+            width = len(self.names) if self.names else len(rows[0])
+            rows = [self._check_width(row, width) for row in rows]
+            columns = [list(column) for column in zip(*rows)]
+            self.names = self.names or [f'column_{idx}' for idx in range(1, width + 1)]
+        arrays = [pa.array(column) for column in columns]
+        if self.schema is None:
+            batch = pa.RecordBatch.from_arrays(arrays, names=self.names)
+            self.schema = batch.schema
+            return batch
+        for idx, array in enumerate(arrays):
+            field = self.schema.field(idx)
+            if not self.locked and pa.types.is_null(field.type):
+                self.schema = self.schema.set(idx, field.with_type(array.type))
+            elif array.type != field.type:
+                arrays[idx] = self._cast(array, field)
+        return pa.RecordBatch.from_arrays(arrays, names=self.schema.names)
+
+    def _check_width(self, row, width):
+        if len(row) == width:
+            return row
+        if self.declared and len(row) < width:
+            return list(row) + [None] * (width - len(row))
+        raise ValueError(f'rows must have {width} values, got {len(row)}.')
+
+    def _conform(self, batch):
+        if batch.schema == self.schema:
+            return batch
+        return pa.RecordBatch.from_arrays(
+            [
+                array if array.type == field.type else self._cast(array, field)
+                for array, field in zip(batch.columns, self.schema)
+            ],
+            schema=self.schema,
+        )
+
+    def _cast(self, array, field):
+        try:
+            return array.cast(field.type, safe=True)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(
+                f'values of column `{field.name}` do not match its type `{field.type}`, '
+                f'set the column type with the `schema` argument: {e}',
+            ) from e
+
+
+@register('parquet')
+class ParquetRenderer(BaseRenderer):
+    """
+    Parquet Renderer class.
+    Inherits from BaseRenderer class and implements
+    the generation report function, exporting the data
+    to a Parquet file.
+
+    Rows are converted to record batches of `batch_size` rows
+    (renderer argument) that are written one at a time, so only
+    a batch is kept in memory. Without a `schema`, batches are kept
+    until every column has a value that gives it a type.
+    Requires the `pyarrow` package.
+    """
+    def generate_report(self, data, output_file):
+        output_file = f'{output_file}.parquet'
+        builder = self._get_builder()
+        writer = None
+        try:
+            for rows in chunks(data, self.args.get('batch_size', DEFAULT_BATCH_SIZE)):
+                for batch in builder.add(rows):
+                    writer = writer or self._get_writer(output_file, builder.schema)
+                    writer.write_batch(batch)
+            for batch in builder.flush():
+                writer = writer or self._get_writer(output_file, builder.schema)
+                writer.write_batch(batch)
+            writer = writer or self._get_writer(output_file, builder.schema)
+        finally:
+            if writer:
+                writer.close()
+        return output_file
+
+    async def generate_report_async(self, data, output_file):
+        output_file = f'{output_file}.parquet'
+        builder = self._get_builder()
+        data = self.get_async_iterator(data)
+        writer = None
+        try:
+            async for rows in achunks(data, self.args.get('batch_size', DEFAULT_BATCH_SIZE)):
+                for batch in builder.add(rows):
+                    if writer is None:
+                        writer = await self._to_thread(
+                            self._get_writer, output_file, builder.schema,
+                        )
+                    await self._to_thread(writer.write_batch, batch)
+            for batch in builder.flush():
+                if writer is None:
+                    writer = await self._to_thread(self._get_writer, output_file, builder.schema)
+                await self._to_thread(writer.write_batch, batch)
+            if writer is None:
+                writer = await self._to_thread(self._get_writer, output_file, builder.schema)
+        finally:
+            if writer:
+                await self._to_thread(writer.close)
+        return output_file
+
+    def _get_builder(self):
+        return RecordBatchBuilder(
+            schema=self.args.get('schema'),
+            columns=self.args.get('columns'),
+        )
+
+    def _get_writer(self, output_file, schema):
+        return pq.ParquetWriter(
+            output_file,
+            schema if schema is not None else pa.schema([]),
+            compression=self.args.get('compression', 'snappy'),
+        )
+
+    @classmethod
+    def _validate_schema(cls, schema):
+        if not isinstance(schema, list):
+            return ['`schema` must be a list of columns.']
+        errors = []
+        for column in schema:
+            if not isinstance(column, dict) or 'name' not in column or 'type' not in column:
+                errors.append('`schema` columns must have `name` and `type`.')
+                continue
+            try:
+                pa.type_for_alias(column['type'])
+            except (TypeError, ValueError):
+                errors.append(f'invalid type `{column["type"]}` for column `{column["name"]}`.')
+        return errors
+
+    @classmethod
+    def _validate_args(cls, args):
+        errors = []
+        batch_size = args.get('batch_size')
+        if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+            errors.append('`batch_size` must be a positive integer.')
+        columns = args.get('columns')
+        if columns is not None and not isinstance(columns, list):
+            errors.append('`columns` must be a list of column names.')
+        compression = args.get('compression')
+        if compression is not None and compression not in COMPRESSIONS:
+            errors.append(f'`compression` must be one of {", ".join(COMPRESSIONS)}.')
+        if args.get('schema') is not None:
+            errors.extend(cls._validate_schema(args['schema']))
+        return errors
+
+    @classmethod
+    def validate(cls, definition):
+        if pa is None:
+            return ['`pyarrow` package is required for parquet renderer.']
+        errors = super(ParquetRenderer, cls).validate(definition)
+        if definition.args is not None:
+            errors.extend(cls._validate_args(definition.args))
+        return errors
@@ -3,13 +3,71 @@
 import os
 import pathlib
 from functools import partial
+from urllib.parse import unquote, urlparse
 
 from weasyprint import CSS, HTML, default_url_fetcher
 
+from connect.reports.cache import LRUCache, get_file_version
 from connect.reports.renderers.j2 import Jinja2Renderer
 from connect.reports.renderers.registry import register
 
 
+DEFAULT_ASSET_CACHE_SIZE = 64 * 1024 * 1024
+
+asset_cache = LRUCache(DEFAULT_ASSET_CACHE_SIZE)
+
+
+def configure_asset_cache(max_size=DEFAULT_ASSET_CACHE_SIZE):
+    """
+    Replaces the process-wide cache of parsed stylesheets and fetched
+    local assets used by the PDF renderer.
+
+    :param max_size: Memory cap in bytes.
+    :type max_size: int
+    """
+    global asset_cache
+    asset_cache = LRUCache(max_size)
+
+
+def cached_url_fetcher(url):
+    """
+    Fetches the url through `default_url_fetcher` keeping the content
+    of local files in the asset cache, keyed by path and mtime.
+    """
+    if not url.startswith('file://'):
+        return default_url_fetcher(url)
+    path = unquote(urlparse(url).path)
+    version = get_file_version(path)
+    if version is None:
+        return default_url_fetcher(url)
+    key = ('asset', path, version)
+    result = asset_cache.get(key)
+    if result is None:
+        result = dict(default_url_fetcher(url))
+        file_obj = result.pop('file_obj', None)
+        if file_obj is not None:
+            with file_obj:
+                result['string'] = file_obj.read()
+        asset_cache.set(key, result, size=len(result['string']))
+    return dict(result)
+
+
+def get_stylesheet(path, fetcher):
+    """
+    Returns the parsed stylesheet from the asset cache,
+    keyed by path and mtime.
+    """
+    version = get_file_version(path)
+    if version is None:
+        return CSS(filename=path, url_fetcher=fetcher)
+    key = ('css', os.path.abspath(path), version)
+    css = asset_cache.get(key)
+    if css is None:
+        css = CSS(filename=path, url_fetcher=fetcher)
+        asset_cache.set(key, css, size=version[1])
+    return css
+
+
 def local_fetcher(url, root_dir=None, template_dir=None, cwd=None):
     tpl_dir_path = pathlib.Path(os.path.abspath(root_dir)) / pathlib.Path(template_dir)
     tpl_dir_url = tpl_dir_path.as_uri()
@@ -24,7 +82,7 @@ def local_fetcher(url, root_dir=None, template_dir=None, cwd=None):
         count = url.count(template_dir)
         if url.count(template_dir) > 1:
             url = url.replace(f'{template_dir}/', '', count - 1)
-    return default_url_fetcher(url)
+    return cached_url_fetcher(url)
 
 
 @register('pdf')
@@ -34,6 +92,18 @@ class PDFRenderer(Jinja2Renderer):
     Inherits from BaseRenderer class and implements
     the generation report function, exporting the data
     to a PDF file.
+
+    When the `in_memory` argument is set, the rendered HTML is passed
+    to WeasyPrint as a string instead of being written to and read back
+    from an intermediate file.
+
+    Parsed stylesheets and local assets (images, fonts) are kept
+    in a process-wide cache shared by all the renders.
+
+    The PDF output can be tuned with the following arguments:
+    `compress_pdf` (compress PDF streams, disabled by default),
+    `optimize_images` (lossless image optimization), `jpeg_quality`
+    (0 to 95) and `dpi` (maximum resolution of the embedded images).
     """
 
     def generate_report(self, data, output_file):
@@ -41,20 +111,14 @@ class PDFRenderer(Jinja2Renderer):
         if tokens[-1] != 'pdf':
             output_file = f'{tokens[0]}.pdf'
 
-        rendered_file = super().generate_report(data, output_file)
-        fetcher = partial(
-            local_fetcher,
-            root_dir=self.root_dir,
-            template_dir=os.path.dirname(self.template),
-            cwd=self.current_working_directory,
-        )
-        options = {'uncompressed_pdf': True}
-        css_file = self.args.get('css_file')
-        if css_file:
-            css = CSS(filename=os.path.join(self.root_dir, css_file), url_fetcher=fetcher)
-            options.update({'stylesheets': [css]})
-        html = HTML(filename=rendered_file, url_fetcher=fetcher)
-        html.write_pdf(output_file, **options)
+        if self.args.get('in_memory', False):
+            source = {
+                'string': self.get_template().render(self.get_context(data)),
+                'base_url': self._get_base_url(output_file),
+            }
+        else:
+            source = {'filename': super().generate_report(data, output_file)}
+        self._write_pdf(source, output_file)
         return output_file
 
     async def generate_report_async(self, data, output_file):
@@ -62,29 +126,72 @@ class PDFRenderer(Jinja2Renderer):
         if tokens[-1] != 'pdf':
             output_file = f'{tokens[0]}.pdf'
 
-        rendered_file = await super().generate_report_async(data, output_file)
+        if self.args.get('in_memory', False):
+            template = self.get_template(enable_async=True)
+            source = {
+                'string': await template.render_async(self.get_context(data)),
+                'base_url': self._get_base_url(output_file),
+            }
+        else:
+            source = {'filename': await super().generate_report_async(data, output_file)}
+        await self._to_thread(self._write_pdf, source, output_file)
+        return output_file
+
+    def get_stream_entry_name(self):
+        return None
+
+    def _get_base_url(self, output_file):
+        """
+        Relative urls must be resolved as if the document had been
+        rendered next to the output file, so `local_fetcher` rewrites
+        them the same way in both modes.
+        """
+        return os.path.join(os.path.dirname(os.path.abspath(output_file)), '')
+
+    def _write_pdf(self, source, output_file):
         fetcher = partial(
             local_fetcher,
             root_dir=self.root_dir,
             template_dir=os.path.dirname(self.template),
             cwd=self.current_working_directory,
         )
+        options = self._get_pdf_options()
+        css_file = self.args.get('css_file')
+        if css_file:
+            css = get_stylesheet(os.path.join(self.root_dir, css_file), fetcher)
+            options.update({'stylesheets': [css]})
+        html = HTML(url_fetcher=fetcher, **source)
+        html.write_pdf(output_file, **options)
 
-        def _generate():
-            options = {'uncompressed_pdf': True}
-            css_file = self.args.get('css_file')
-            if css_file:
-                css = CSS(filename=os.path.join(self.root_dir, css_file), url_fetcher=fetcher)
-                options.update({'stylesheets': [css]})
-            html = HTML(filename=rendered_file, url_fetcher=fetcher)
-            html.write_pdf(output_file, **options)
-        await self._to_thread(_generate)
-        return output_file
+    def _get_pdf_options(self):
+        options = {'uncompressed_pdf': not self.args.get('compress_pdf', False)}
+        for option in ('optimize_images', 'jpeg_quality', 'dpi'):
+            if self.args.get(option) is not None:
+                options[option] = self.args[option]
+        return options
+
+    @classmethod
+    def _validate_args(cls, args):
+        errors = []
+        for option in ('in_memory', 'compress_pdf', 'optimize_images'):
+            value = args.get(option)
+            if value is not None and not isinstance(value, bool):
+                errors.append(f'`{option}` must be boolean.')
+        jpeg_quality = args.get('jpeg_quality')
+        if jpeg_quality is not None and (
+            not isinstance(jpeg_quality, int) or not 0 <= jpeg_quality <= 95
+        ):
+            errors.append('`jpeg_quality` must be an integer between 0 and 95.')
+        dpi = args.get('dpi')
+        if dpi is not None and (not isinstance(dpi, int) or dpi < 1):
+            errors.append('`dpi` must be a positive integer.')
+        return errors
 
     @classmethod
     def validate(cls, definition):
         errors = super(PDFRenderer, cls).validate(definition)
         if definition.args is not None:
+            errors.extend(cls._validate_args(definition.args))
             css_file = definition.args.get('css_file')
             if css_file and not os.path.isfile(
                 os.path.join(definition.root_path, css_file),
@@ -1,10 +1,24 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import importlib
+
 from connect.reports.renderers.base import BaseRenderer
 
 
 _RENDERERS = {}
 
+# Renderers registered by the module that defines them,
+# imported on first use.
+_LAZY_RENDERERS = {
+    'csv': 'connect.reports.renderers.csv',
+    'jinja2': 'connect.reports.renderers.j2',
+    'json': 'connect.reports.renderers.json',
+    'ndjson': 'connect.reports.renderers.ndjson',
+    'parquet': 'connect.reports.renderers.parquet',
+    'pdf': 'connect.reports.renderers.pdf',
+    'xlsx': 'connect.reports.renderers.xlsx',
+}
+
 
 class RendererAlreadyRegisteredError(Exception):
     pass
@@ -21,6 +35,9 @@ def register(name):
     def _wrapper(cls):
         if not issubclass(cls, BaseRenderer):
             raise ValueError('The provided class must be a subclass of BaseRenderer.')
+        # lazy renderers can only be registered by their own module
+        if name in _LAZY_RENDERERS and cls.__module__ != _LAZY_RENDERERS[name]:
+            raise RendererAlreadyRegisteredError(f'The renderer {name} is already registered.')
 
         _RENDERERS[name] = cls
 
@@ -28,16 +45,41 @@ def register(name):
     return _wrapper
 
 
+def register_lazy(name, module):
+    """
+    Registers a renderer by the name of the module that defines it
+    with the `register` decorator. The module is imported the first
+    time the renderer class is requested.
+
+    :param name: Renderer type.
+    :type name: str
+    :param module: Full name of the renderer module.
+    :type module: str
+    """
+    if name in _RENDERERS or name in _LAZY_RENDERERS:
+        raise RendererAlreadyRegisteredError(f'The renderer {name} is already registered.')
+    _LAZY_RENDERERS[name] = module
+
+
 def get_renderer_class(name):
+    if name not in _RENDERERS and name in _LAZY_RENDERERS:
+        importlib.import_module(_LAZY_RENDERERS[name])
     if name not in _RENDERERS:
         raise RendererNotFoundError(f'The renderer {name} does not exist.')
     return _RENDERERS[name]
 
 
-def get_renderer(name, environment, project_dir, account, report, template=None, args=None):
+def get_renderer(
+    name, environment, project_dir, account, report, template=None, args=None,
+    executor=None, process_executor=None,
+):
     cls = get_renderer_class(name)
-    return cls(environment, project_dir, account, report, template, args)
+    return cls(
+        environment, project_dir, account, report, template, args,
+        executor=executor,
+        process_executor=process_executor,
+    )
 
 
 def get_renderers():
-    return _RENDERERS.keys()
+    return {**_LAZY_RENDERERS, **_RENDERERS}.keys()
@@ -1,17 +1,140 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import asyncio
+import contextlib
+import io
+from itertools import islice
+
+from connect.reports.renderers.executor import get_default_executor
+
+
+DEFAULT_PREFETCH_BATCH_SIZE = 100
+DEFAULT_PREFETCH_BATCHES = 4
+
+
 class aiter:
     """
     Convert to async iterator.
+
+    Items are pulled from the sync iterable in batches of `batch_size`
+    items, each batch fetched by a call submitted to `executor` (the
+    default renderers executor if not set), so a blocking `next()`
+    (a lazy DB cursor, a generator doing I/O) never runs on the event loop.
+    At most `prefetch` batches are fetched ahead of the consumer.
     """
-    def __init__(self, values):
+    def __init__(
+        self,
+        values,
+        batch_size=DEFAULT_PREFETCH_BATCH_SIZE,
+        prefetch=DEFAULT_PREFETCH_BATCHES,
+        executor=None,
+    ):
+        self._queue = None
+        self._producer = None
+        self._batch = iter(())
+        self._done = False
+        self._batch_size = batch_size
+        self._prefetch = prefetch
+        self._executor = executor
         self._values = iter(values)
 
-    async def __anext__(self):
+    @staticmethod
+    async def _produce(queue, values, batch_size, executor):
+        # the producer must not reference the adapter
+        # so an abandoned adapter can be collected and stop it.
+        loop = asyncio.get_running_loop()
         try:
-            return next(self._values)
-        except StopIteration:
+            while True:
+                batch = await loop.run_in_executor(
+                    executor, lambda: list(islice(values, batch_size)),
+                )
+                if not batch:
+                    break
+                await queue.put((batch, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # any error of the source, including a RuntimeError
+            # for a StopIteration raised by a generator (PEP 479)
+            await queue.put((None, e))
+            return
+        await queue.put((None, None))
+
+    async def __anext__(self):
+        for value in self._batch:
+            return value
+        if self._done:
             raise StopAsyncIteration
+        if self._producer is None:
+            self._queue = asyncio.Queue(maxsize=self._prefetch)
+            self._producer = asyncio.ensure_future(
+                self._produce(
+                    self._queue,
+                    self._values,
+                    self._batch_size,
+                    self._executor or get_default_executor(),
+                ),
+            )
+        batch, error = await self._queue.get()
+        if error is not None:
+            self._done = True
+            raise error
+        if batch is None:
+            self._done = True
+            raise StopAsyncIteration
+        self._batch = iter(batch)
+        return next(self._batch)
 
     def __aiter__(self):
         return self
+
+    def close(self):
+        """
+        Stops prefetching when the iteration is abandoned.
+        """
+        self._done = True
+        if self._producer is not None and not self._producer.done():
+            with contextlib.suppress(RuntimeError):
+                # the event loop may already be closed
+                self._producer.cancel()
+
+    def __del__(self):
+        self.close()
+
+
+def chunks(values, size):
+    """
+    Group the items of an iterable into lists of at most `size` items.
+    """
+    values = iter(values)
+    chunk = list(islice(values, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(values, size))
+
+
+async def achunks(values, size):
+    """
+    Group the items of an async iterator into lists of at most `size` items.
+    """
+    chunk = []
+    async for value in values:
+        chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@contextlib.contextmanager
+def text_stream(stream):
+    """
+    Wraps a binary stream to write text into it,
+    leaving the stream open on exit.
+    """
+    wrapper = io.TextIOWrapper(stream, write_through=True)
+    try:
+        yield wrapper
+    finally:
+        wrapper.detach()
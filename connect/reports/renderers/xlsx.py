@@ -1,20 +1,101 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
-import inspect
 import json
 import os
+import pickle
+from copy import copy
 from datetime import datetime
-from zipfile import BadZipfile
+from xml.etree import ElementTree
+from zipfile import BadZipfile, ZipFile
 
 import pytz
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.styles.colors import WHITE, Color
-from openpyxl.utils.exceptions import InvalidFileException
 
+from connect.reports.cache import LRUCache, get_file_version
 from connect.reports.renderers.base import BaseRenderer
 from connect.reports.renderers.registry import register
-from connect.reports.renderers.utils import aiter
+from connect.reports.renderers.utils import achunks
+
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_TEMPLATE_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_WORKBOOK_PART = 'xl/workbook.xml'
+OFFICE_DOCUMENT_REL = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+)
+
+template_cache = LRUCache(DEFAULT_TEMPLATE_CACHE_SIZE)
+
+
+def configure_template_cache(max_size=DEFAULT_TEMPLATE_CACHE_SIZE):
+    """
+    Replaces the process-wide cache of parsed XLSX templates.
+
+    :param max_size: Memory cap in bytes of the cached snapshots.
+    :type max_size: int
+    """
+    global template_cache
+    template_cache = LRUCache(max_size)
+
+
+def load_template(path):
+    """
+    Returns a fresh copy of the template workbook.
+    Parsed templates are kept in the template cache as pickled
+    snapshots keyed by path and mtime: unpickling a snapshot
+    is much cheaper than parsing the template again.
+
+    :param path: Template file path.
+    :type path: str
+    :returns: The template workbook.
+    :rtype: Workbook
+    """
+    version = get_file_version(path)
+    if version is None:
+        return load_workbook(path)
+    key = (os.path.abspath(path), version)
+    snapshot = template_cache.get(key)
+    if snapshot is not None:
+        return pickle.loads(snapshot)
+    wb = load_workbook(path)
+    try:
+        snapshot = pickle.dumps(wb, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # templates embedding unpicklable objects are just not cached
+        return wb
+    template_cache.set(key, snapshot, size=len(snapshot))
+    return wb
+
+
+def get_template_sheet_names(path):
+    """
+    Returns the sheet names of a XLSX file reading only the zip central
+    directory and the workbook part, without loading any cell.
+
+    :param path: Template file path.
+    :type path: str
+    :returns: The sheet names.
+    :rtype: list
+    :raises BadZipfile: if the file is not a valid zip.
+    :raises KeyError: if the workbook part is missing.
+    :raises ElementTree.ParseError: if the workbook part is not valid xml.
+    """
+    with ZipFile(path) as zf:
+        workbook_part = DEFAULT_WORKBOOK_PART
+        if '_rels/.rels' in zf.namelist():
+            rels = ElementTree.fromstring(zf.read('_rels/.rels'))
+            for rel in rels:
+                if rel.get('Type') == OFFICE_DOCUMENT_REL:
+                    workbook_part = rel.get('Target').lstrip('/')
+                    break
+        workbook = ElementTree.fromstring(zf.read(workbook_part))
+    return [
+        element.get('name') for element in workbook.iter()
+        if element.tag.rsplit('}', 1)[-1] == 'sheet'
+    ]
 
 
 @register('xlsx')
@@ -24,6 +105,15 @@ class XLSXRenderer(BaseRenderer):
     Inherits from BaseRenderer class and implements
     the generation report function, exporting the data
     to a Excel file.
+
+    When the `streaming` argument is set, the report is written
+    through an openpyxl write-only workbook: the template sheets
+    (and the rows of the `Data` sheet above `start_row`) are copied
+    into it and the data rows are appended keeping memory constant.
+
+    In the async paths rows are written to the worksheet in chunks
+    of `chunk_size` rows through the renderer executor, so the event
+    loop is never blocked by cell population.
     """
     def render(self, data, output_file, start_time=None):
         self.start_time = start_time or datetime.now(tz=pytz.utc)
@@ -31,22 +121,23 @@ class XLSXRenderer(BaseRenderer):
 
     async def render_async(self, data, output_file, start_time=None):
         self.start_time = start_time or datetime.now(tz=pytz.utc)
+        if self.process_executor is not None:
+            return await self.render_in_process_async(data, output_file, self.start_time)
         return await self.generate_report_async(data, output_file)
 
     def generate_report(self, data, output_file):
+        if self.args.get('streaming', False):
+            return self._generate_streaming_report(data, output_file)
         start_col_idx = self.args.get('start_col', 1)
         row_idx = self.args.get('start_row', 2)
-        wb = load_workbook(
+        wb = load_template(
             os.path.join(
                 self.root_dir,
                 self.template,
             ),
         )
         ws = wb['Data']
-        for row in data:
-            for col_idx, cell_value in enumerate(row, start=start_col_idx):
-                ws.cell(row_idx, col_idx, value=cell_value)
-            row_idx += 1
+        self._write_rows(ws, data, row_idx, start_col_idx)
 
         self._add_info_sheet(wb.create_sheet('Info'), self.start_time)
 
@@ -55,22 +146,23 @@ class XLSXRenderer(BaseRenderer):
         return output_file
 
     async def generate_report_async(self, data, output_file):
+        if self.args.get('streaming', False):
+            return await self._generate_streaming_report_async(data, output_file)
         start_col_idx = self.args.get('start_col', 1)
         row_idx = self.args.get('start_row', 2)
         wb = await self._to_thread(
-            load_workbook,
+            load_template,
             os.path.join(
                 self.root_dir,
                 self.template,
             ),
         )
         ws = wb['Data']
-        if not inspect.isasyncgen(data):
-            data = aiter(data)
-        async for row in data:
-            for col_idx, cell_value in enumerate(row, start=start_col_idx):
-                ws.cell(row_idx, col_idx, value=cell_value)
-            row_idx += 1
+        data = self.get_async_iterator(data)
+        async for rows in achunks(data, self.args.get('chunk_size', DEFAULT_CHUNK_SIZE)):
+            row_idx = await self._to_thread(
+                self._write_rows, ws, rows, row_idx, start_col_idx,
+            )
 
         self._add_info_sheet(wb.create_sheet('Info'), self.start_time)
 
@@ -78,6 +170,143 @@ class XLSXRenderer(BaseRenderer):
         await self._to_thread(wb.save, output_file)
         return output_file
 
+    def _generate_streaming_report(self, data, output_file):
+        wb, ws = self._create_streaming_workbook(
+            load_template(os.path.join(self.root_dir, self.template)),
+        )
+        self._append_rows(ws, data, self._get_row_padding())
+
+        self._append_info_sheet(wb.create_sheet('Info'), self.start_time)
+
+        output_file = f'{output_file}.xlsx'
+        wb.save(output_file)
+        return output_file
+
+    async def _generate_streaming_report_async(self, data, output_file):
+        template_wb = await self._to_thread(
+            load_template,
+            os.path.join(
+                self.root_dir,
+                self.template,
+            ),
+        )
+        wb, ws = self._create_streaming_workbook(template_wb)
+        padding = self._get_row_padding()
+        data = self.get_async_iterator(data)
+        async for rows in achunks(data, self.args.get('chunk_size', DEFAULT_CHUNK_SIZE)):
+            await self._to_thread(self._append_rows, ws, rows, padding)
+
+        self._append_info_sheet(wb.create_sheet('Info'), self.start_time)
+
+        output_file = f'{output_file}.xlsx'
+        await self._to_thread(wb.save, output_file)
+        return output_file
+
+    def _write_rows(self, ws, rows, row_idx, start_col_idx):
+        for row in rows:
+            for col_idx, cell_value in enumerate(row, start=start_col_idx):
+                ws.cell(row_idx, col_idx, value=cell_value)
+            row_idx += 1
+        return row_idx
+
+    def _append_rows(self, ws, rows, padding):
+        for row in rows:
+            ws.append(padding + list(row))
+
+    def _get_row_padding(self):
+        return [None] * (self.args.get('start_col', 1) - 1)
+
+    def _create_streaming_workbook(self, template_wb):
+        """
+        Creates a write-only workbook that replicates the template sheets.
+        Every sheet is copied as is except for the `Data` one, from which only
+        the rows above `start_row` are kept so data rows can be appended to it.
+
+        :param template_wb: Loaded template workbook.
+        :type template_wb: Workbook
+        :returns: The write-only workbook and its `Data` sheet.
+        :rtype: tuple
+        """
+        start_row = self.args.get('start_row', 2)
+        wb = Workbook(write_only=True)
+        data_ws = None
+        for template_ws in template_wb.worksheets:
+            ws = wb.create_sheet(template_ws.title)
+            if template_ws.title == 'Data':
+                data_ws = ws
+                self._copy_sheet(template_ws, ws, start_row - 1)
+            else:
+                self._copy_sheet(template_ws, ws, template_ws.max_row)
+        return wb, data_ws
+
+    def _copy_sheet(self, source, target, max_row):
+        for key, dimension in source.column_dimensions.items():
+            target.column_dimensions[key] = copy(dimension)
+        for key, dimension in source.row_dimensions.items():
+            if key <= max_row:
+                target.row_dimensions[key] = copy(dimension)
+        for merged_range in source.merged_cells.ranges:
+            if merged_range.max_row <= max_row:
+                target.merged_cells.add(str(merged_range))
+        target.sheet_format = copy(source.sheet_format)
+        target.sheet_properties = copy(source.sheet_properties)
+        target.freeze_panes = source.freeze_panes
+        if max_row < 1:
+            return
+        for row in source.iter_rows(max_row=max_row):
+            target.append([self._copy_cell(target, cell) for cell in row])
+
+    def _copy_cell(self, ws, source):
+        cell = WriteOnlyCell(ws, value=source.value)
+        if source.has_style:
+            cell.font = copy(source.font)
+            cell.fill = copy(source.fill)
+            cell.border = copy(source.border)
+            cell.alignment = copy(source.alignment)
+            cell.protection = copy(source.protection)
+            cell.number_format = source.number_format
+        return cell
+
+    def _get_info_values(self, start_time):
+        return [
+            ('Report Start time', start_time.strftime('%Y-%m-%d %H:%M:%S')),
+            ('Report Finish time', datetime.now(tz=pytz.utc).strftime('%Y-%m-%d %H:%M:%S')),
+            ('Account ID', self.account.id),
+            ('Account Name', self.account.name),
+            ('Report ID', self.report.id),
+            ('Report Name', self.report.name),
+            ('Runtime environment', self.environment),
+            (
+                'Report execution parameters',
+                json.dumps(self.report.values, indent=4, sort_keys=True),
+            ),
+        ]
+
+    def _append_info_sheet(self, ws, start_time):
+        ws.column_dimensions['A'].width = 50
+        ws.column_dimensions['B'].width = 180
+        ws.merged_cells.add('A1:B1')
+        title = WriteOnlyCell(ws, value='Report Execution Information')
+        title.fill = PatternFill('solid', start_color=Color('1565C0'))
+        title.font = Font(sz=24, color=WHITE)
+        title.alignment = Alignment(horizontal='center', vertical='center')
+        ws.append([title])
+        info_values = self._get_info_values(start_time)
+        for idx, (name, value) in enumerate(info_values, start=1):
+            ws.append([
+                self._create_info_cell(ws, name),
+                self._create_info_cell(ws, value, wrap_text=idx == len(info_values)),
+            ])
+
+    def _create_info_cell(self, ws, value, wrap_text=False):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.alignment = Alignment(
+            horizontal='left',
+            vertical='top',
+            wrap_text=wrap_text or None,
+        )
+        return cell
+
     def _add_info_sheet(self, ws, start_time):
         ws.column_dimensions['A'].width = 50
         ws.column_dimensions['B'].width = 180
@@ -95,22 +324,9 @@ class XLSXRenderer(BaseRenderer):
                 horizontal='left',
                 vertical='top',
             )
-        ws['A2'].value = 'Report Start time'
-        ws['B2'].value = start_time.strftime('%Y-%m-%d %H:%M:%S')
-        ws['A3'].value = 'Report Finish time'
-        ws['B3'].value = datetime.now(tz=pytz.utc).strftime('%Y-%m-%d %H:%M:%S')
-        ws['A4'].value = 'Account ID'
-        ws['B4'].value = self.account.id
-        ws['A5'].value = 'Account Name'
-        ws['B5'].value = self.account.name
-        ws['A6'].value = 'Report ID'
-        ws['B6'].value = self.report.id
-        ws['A7'].value = 'Report Name'
-        ws['B7'].value = self.report.name
-        ws['A8'].value = 'Runtime environment'
-        ws['B8'].value = self.environment
-        ws['A9'].value = 'Report execution parameters'
-        ws['B9'].value = json.dumps(self.report.values, indent=4, sort_keys=True)
+        for idx, (name, value) in enumerate(self._get_info_values(start_time), start=2):
+            ws[f'A{idx}'].value = name
+            ws[f'B{idx}'].value = value
         ws['B9'].alignment = Alignment(
             horizontal='left',
             vertical='top',
@@ -122,6 +338,14 @@ class XLSXRenderer(BaseRenderer):
         errors = []
         start_row = args.get('start_row')
         start_col = args.get('start_col')
+        streaming = args.get('streaming')
+        chunk_size = args.get('chunk_size')
+        if streaming is not None and not isinstance(streaming, bool):
+            errors.append('`streaming` must be boolean.')
+        if chunk_size is not None and (
+            not isinstance(chunk_size, int) or chunk_size < 1
+        ):
+            errors.append('`chunk_size` must be a positive integer.')
         if start_row is not None:
             if not isinstance(start_row, int):
                 errors.append('`start_row` must be integer.')
@@ -150,10 +374,14 @@ class XLSXRenderer(BaseRenderer):
 
         try:
             template_file = os.path.join(definition.root_path, definition.template)
-            load_workbook(template_file)
-        except (InvalidFileException, BadZipfile):
+            sheet_names = get_template_sheet_names(template_file)
+        except (BadZipfile, KeyError, ElementTree.ParseError):
             errors.append(f'template `{definition.template}` not valid or empty.')
+        else:
+            if 'Data' not in sheet_names:
+                errors.append(f'template `{definition.template}` has no `Data` sheet.')
 
         if definition.args is not None:
             errors.extend(cls._validate_args(definition.args))
+            errors.extend(cls._validate_prefetch_args(definition.args))
         return errors
@@ -3,6 +3,9 @@
 import json
 import os
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 
 import jsonschema
 
@@ -31,27 +34,90 @@ JSON_REPORTS_SCHEMA = os.path.join(
 )
 
 
+@dataclass(frozen=True)
+class SchemaError:
+    """
+    Reports descriptor json schema violation.
+
+    :param path: JSON path of the invalid value.
+    :type path: str
+    :param message: Error description.
+    :type message: str
+    """
+    path: str
+    message: str
+
+    def __str__(self):
+        return f'{self.path}: {self.message}'
+
+
+def _get_json_path(path):
+    return '$' + ''.join(
+        f'[{item}]' if isinstance(item, int) else f'.{item}'
+        for item in path
+    )
+
+
 def _get_duplicates(data):
     return [
         item for item, count in Counter(data).items() if count > 1
     ]
 
 
-def validate_with_schema(json_data):
+@lru_cache(maxsize=None)
+def get_schema_validator():
+    """
+    Returns the reports json schema validator, loading
+    and compiling the schema only once.
+
+    :returns: The json schema validator.
+    :rtype: jsonschema.protocols.Validator
+    """
+    with open(JSON_REPORTS_SCHEMA, 'r') as fp:
+        json_schema = json.load(fp)
+    validator_cls = jsonschema.validators.validator_for(json_schema)
+    validator_cls.check_schema(json_schema)
+    return validator_cls(json_schema)
+
+
+def get_schema_errors(json_data):
+    """
+    Validates reports descriptor content against json schema
+    collecting every error in one pass.
+
+    :param json_data: Reports descriptor content.
+    :type json_data: dict
+    :returns: A list of SchemaError.
+    :rtype: list
+    """
+    errors = []
+    for error in get_schema_validator().iter_errors(json_data):
+        error = jsonschema.exceptions.best_match([error])
+        errors.append(
+            SchemaError(path=_get_json_path(error.absolute_path), message=error.message),
+        )
+    return errors
+
+
+def validate_with_schema(json_data, all_errors=False):
     """
     Validates reports descriptor content against json schema.
 
     :param json_data: Reports descriptor string content.
     :type json_data: dict
-    :returns: A string list of errors if exist.
+    :param all_errors: Collect every error instead of the most relevant one.
+    :type all_errors: bool
+    :returns: A string list of errors if exist,
+              a list of SchemaError if `all_errors` is set.
     :rtype: str
     """
-    with open(JSON_REPORTS_SCHEMA, 'r') as fp:
-        json_schema = json.load(fp)
-    try:
-        jsonschema.validate(instance=json_data, schema=json_schema)
-    except jsonschema.exceptions.ValidationError as errors:
-        return str(errors)
+    if all_errors:
+        return get_schema_errors(json_data)
+    error = jsonschema.exceptions.best_match(
+        get_schema_validator().iter_errors(json_data),
+    )
+    if error is not None:
+        return str(error)
 
 
 def _validate_parameters(report_id, parameters):
@@ -163,16 +229,22 @@ def _validate_report(report):
     return errors
 
 
-def validate(repo):
+def validate(repo, max_workers=None, schema_errors=None):
     """
     Validates whole repository definition.
 
     :param repo: Repository definition object.
     :type repo: RepositoryDefinition
+    :param max_workers: Number of threads used to validate the reports
+                        in parallel, if not set reports are validated sequentially.
+    :type max_workers: int
+    :param schema_errors: Schema errors, as returned by `get_schema_errors`,
+                          reported before the repository ones.
+    :type schema_errors: list
     :returns: A list of errors.
     :rtype: list
     """
-    errors = []
+    errors = [str(error) for error in schema_errors or []]
     if not os.path.isfile(
         os.path.join(repo.root_path, repo.readme_file),
     ):
@@ -180,10 +252,14 @@ def validate(repo):
             'repository property `readme_file` cannot be resolved to a file.',
         )
 
-    reports_local_ids = []
-    for report in repo.reports:
-        reports_local_ids.append(report.local_id)
-        errors.extend(_validate_report(report))
+    reports_local_ids = [report.local_id for report in repo.reports]
+    if max_workers:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            reports_errors = list(executor.map(_validate_report, repo.reports))
+    else:
+        reports_errors = map(_validate_report, repo.reports)
+    for report_errors in reports_errors:
+        errors.extend(report_errors)
 
     diff = set(_get_duplicates(reports_local_ids))
     if diff:
@@ -1,11 +1,46 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
+import json
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from zipfile import ZipFile
 
 import pytest
 from fs.tempfs import TempFS
 
 from connect.reports.datamodels import RendererDefinition
-from connect.reports.renderers.base import BaseRenderer, temp_dir
+from connect.reports.renderers.base import BaseRenderer, is_compressed, temp_dir
+
+
+class PackRenderer(BaseRenderer):
+
+    def generate_report(self, data, output_file):
+        output_file = f'{output_file}.ext'
+        with open(output_file, 'wb') as fp:
+            fp.write(data)
+        return output_file
+
+    async def generate_report_async(self, data, output_file):
+        return self.generate_report(data, output_file)
+
+
+class JoinRenderer(PackRenderer):
+
+    def generate_report(self, data, output_file):
+        return super().generate_report(b''.join(data), output_file)
+
+
+class StreamRenderer(PackRenderer):
+
+    def get_stream_entry_name(self):
+        return 'report.ext'
+
+    def generate_report_stream(self, data, stream):
+        stream.write(data)
+
+    async def generate_report_stream_async(self, data, stream):
+        await self._to_thread(stream.write, data)
 
 
 def test_generate_report():
@@ -126,3 +161,377 @@ def test_temp_dir_windows(mocker):
             pass
     except Exception as exc:
         raise AssertionError(f"'temp_dir' raised an exception {exc}")
+
+
+@pytest.mark.parametrize(
+    ('args', 'compress_type'),
+    (
+        ({}, zipfile.ZIP_DEFLATED),
+        ({'pack_compression': 'stored'}, zipfile.ZIP_STORED),
+        ({'pack_compression': 'bzip2', 'pack_compresslevel': 9}, zipfile.ZIP_BZIP2),
+        ({'pack_compression': 'lzma'}, zipfile.ZIP_LZMA),
+    ),
+)
+def test_render_pack_compression(account_factory, report_factory, args, compress_type):
+    tmp_fs = TempFS()
+    renderer = PackRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args=args,
+    )
+
+    output_file = renderer.render(b'data' * 100, f'{tmp_fs.root_path}/report')
+
+    with ZipFile(output_file) as repzip:
+        assert [info.compress_type for info in repzip.infolist()] == [compress_type] * 2
+        summary = json.loads(repzip.read('summary.json'))
+    method = args.get('pack_compression', 'deflated')
+    assert summary['data']['report_pack_compression'] == {
+        'method': method,
+        'level': args.get('pack_compresslevel'),
+    }
+
+
+@pytest.mark.asyncio
+async def test_render_async_pack_store_compressed(mocker, account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = PackRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_store_compressed': True, 'pack_compresslevel': 9},
+    )
+    mocked_is_compressed = mocker.patch(
+        'connect.reports.renderers.base.is_compressed',
+        wraps=is_compressed,
+    )
+
+    output_file = await renderer.render_async(os.urandom(1024), f'{tmp_fs.root_path}/report')
+
+    with ZipFile(output_file) as repzip:
+        assert repzip.getinfo('report.ext').compress_type == zipfile.ZIP_STORED
+        assert repzip.getinfo('summary.json').compress_type == zipfile.ZIP_DEFLATED
+        summary = json.loads(repzip.read('summary.json'))
+    assert summary['data']['report_pack_compression'] == {'method': 'stored', 'level': None}
+    mocked_is_compressed.assert_called_once()
+
+
+def test_render_pack_store_compressed_not_compressed(mocker, account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = PackRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_store_compressed': True, 'pack_compresslevel': 9},
+    )
+    mocked_is_compressed = mocker.patch(
+        'connect.reports.renderers.base.is_compressed',
+        wraps=is_compressed,
+    )
+
+    output_file = renderer.render(b'data' * 100, f'{tmp_fs.root_path}/report')
+
+    with ZipFile(output_file) as repzip:
+        assert repzip.getinfo('report.ext').compress_type == zipfile.ZIP_DEFLATED
+        summary = json.loads(repzip.read('summary.json'))
+    assert summary['data']['report_pack_compression'] == {'method': 'deflated', 'level': 9}
+    mocked_is_compressed.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ('content', 'expected'),
+    (
+        (b'', False),
+        (b'data' * 1000, False),
+        (os.urandom(1024), True),
+    ),
+)
+def test_is_compressed(content, expected):
+    tmp_fs = TempFS()
+    tmp_fs.writebytes('file', content)
+
+    assert is_compressed(f'{tmp_fs.root_path}/file') is expected
+
+
+@pytest.mark.parametrize(
+    'args',
+    (
+        {'pack_compression': 'deflated', 'pack_compresslevel': 0},
+        {'pack_compression': 'bzip2', 'pack_compresslevel': 9},
+        {'pack_compression': 'lzma', 'pack_store_compressed': True},
+    ),
+)
+def test_validate_pack_args_ok(args):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='json',
+        description='description',
+        args=args,
+    )
+
+    assert BaseRenderer.validate(defs) == []
+
+
+@pytest.mark.parametrize(
+    ('args', 'error'),
+    (
+        (
+            {'pack_compression': 'zip'},
+            '`pack_compression` must be one of stored, deflated, bzip2, lzma.',
+        ),
+        (
+            {'pack_compresslevel': 10},
+            '`pack_compresslevel` is not valid for `deflated` compression.',
+        ),
+        (
+            {'pack_compression': 'bzip2', 'pack_compresslevel': 0},
+            '`pack_compresslevel` is not valid for `bzip2` compression.',
+        ),
+        (
+            {'pack_compression': 'stored', 'pack_compresslevel': 1},
+            '`pack_compresslevel` is not valid for `stored` compression.',
+        ),
+        ({'pack_store_compressed': 'yes'}, '`pack_store_compressed` must be boolean.'),
+        ({'pack_streaming': 1}, '`pack_streaming` must be boolean.'),
+        (
+            {'pack_streaming': True, 'pack_store_compressed': True},
+            '`pack_store_compressed` cannot be used with `pack_streaming`.',
+        ),
+        ({'prefetch_batch_size': 0}, '`prefetch_batch_size` must be a positive integer.'),
+        ({'prefetch_batches': 'a'}, '`prefetch_batches` must be a positive integer.'),
+    ),
+)
+def test_validate_pack_args_invalid(args, error):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='json',
+        description='description',
+        args=args,
+    )
+
+    assert BaseRenderer.validate(defs) == [error]
+
+
+@pytest.mark.parametrize('renderer_cls', (PackRenderer, StreamRenderer))
+def test_render_pack_streaming(mocker, account_factory, report_factory, renderer_cls):
+    tmp_fs = TempFS()
+    renderer = renderer_cls(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_streaming': True},
+    )
+    mocked_temp_dir = mocker.patch('connect.reports.renderers.base.temp_dir', wraps=temp_dir)
+
+    output_file = renderer.render(b'data' * 100, f'{tmp_fs.root_path}/report')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert repzip.namelist() == ['report.ext', 'summary.json']
+        assert repzip.read('report.ext') == b'data' * 100
+        summary = json.loads(repzip.read('summary.json'))
+    assert summary['data']['report_pack_compression']['method'] == 'deflated'
+    assert mocked_temp_dir.called is (renderer_cls is PackRenderer)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('renderer_cls', (PackRenderer, StreamRenderer))
+async def test_render_async_pack_streaming(
+    mocker, account_factory, report_factory, renderer_cls,
+):
+    tmp_fs = TempFS()
+    renderer = renderer_cls(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_streaming': True, 'pack_compression': 'lzma'},
+    )
+    mocked_temp_dir = mocker.patch('connect.reports.renderers.base.temp_dir', wraps=temp_dir)
+
+    output_file = await renderer.render_async(b'data' * 100, f'{tmp_fs.root_path}/report.zip')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert repzip.namelist() == ['report.ext', 'summary.json']
+        assert repzip.getinfo('report.ext').compress_type == zipfile.ZIP_LZMA
+        assert repzip.read('report.ext') == b'data' * 100
+    assert mocked_temp_dir.called is (renderer_cls is PackRenderer)
+
+
+class FailingStreamRenderer(StreamRenderer):
+
+    def generate_report_stream(self, data, stream):
+        stream.write(data)
+        raise ValueError('broken source')
+
+    async def generate_report_stream_async(self, data, stream):
+        self.generate_report_stream(data, stream)
+
+
+def test_render_pack_streaming_failure(account_factory, report_factory):
+    tmp_fs = TempFS()
+    tmp_fs.writebytes('report.zip', b'previous')
+    renderer = FailingStreamRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_streaming': True},
+    )
+
+    with pytest.raises(ValueError, match='broken source'):
+        renderer.render(b'data', f'{tmp_fs.root_path}/report')
+
+    assert tmp_fs.listdir('.') == ['report.zip']
+    assert tmp_fs.readbytes('report.zip') == b'previous'
+
+
+@pytest.mark.asyncio
+async def test_render_async_pack_streaming_failure(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = FailingStreamRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_streaming': True},
+    )
+
+    with pytest.raises(ValueError, match='broken source'):
+        await renderer.render_async(b'data', f'{tmp_fs.root_path}/report')
+
+    assert tmp_fs.listdir('.') == []
+
+
+def test_render_pack_streaming_store_compressed(mocker, account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = StreamRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_streaming': True, 'pack_store_compressed': True},
+    )
+    mocked_temp_dir = mocker.patch('connect.reports.renderers.base.temp_dir', wraps=temp_dir)
+
+    output_file = renderer.render(os.urandom(1024), f'{tmp_fs.root_path}/report')
+
+    assert mocked_temp_dir.called
+    with ZipFile(output_file) as repzip:
+        assert repzip.getinfo('report.ext').compress_type == zipfile.ZIP_STORED
+
+
+def test_generate_report_stream():
+    with pytest.raises(NotImplementedError):
+        BaseRenderer.generate_report_stream(None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_generate_report_stream_async():
+    with pytest.raises(NotImplementedError):
+        await BaseRenderer.generate_report_stream_async(None, None, None)
+
+
+class Rows:
+    # a lazy source that cannot be pickled
+    def __init__(self, rows):
+        self.rows = rows
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class AsyncRows(Rows):
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'data_type',
+    ('bytes', 'generator', 'async_generator', 'iterator', 'iterable', 'async_iterable'),
+)
+async def test_render_async_process_executor(account_factory, report_factory, data_type):
+    def generator():
+        yield b'data'
+
+    async def async_generator():
+        yield b'data'
+
+    data = {
+        'bytes': [b'data'],
+        'generator': generator(),
+        'async_generator': async_generator(),
+        'iterator': map(bytes, [b'data']),
+        'iterable': Rows([b'data']),
+        'async_iterable': AsyncRows([b'data']),
+    }[data_type]
+    tmp_fs = TempFS()
+    with ProcessPoolExecutor(max_workers=1) as process_executor:
+        renderer = JoinRenderer(
+            'runtime',
+            tmp_fs.root_path,
+            account_factory(),
+            report_factory(),
+            args={'pack_compression': 'stored'},
+            process_executor=process_executor,
+        )
+        renderer.set_extra_context({'key': 'value'})
+        output_file = await renderer.render_async(data, f'{tmp_fs.root_path}/report')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert repzip.read('report.ext') == b'data'
+        assert repzip.getinfo('report.ext').compress_type == zipfile.ZIP_STORED
+
+
+def test_get_init_kwargs(account_factory, report_factory):
+    account = account_factory()
+    report = report_factory()
+    renderer = PackRenderer(
+        'runtime', 'root_dir', account, report, template='template', args={'a': 'b'},
+    )
+
+    assert renderer.get_init_kwargs() == {
+        'environment': 'runtime',
+        'root_dir': 'root_dir',
+        'account': account,
+        'report': report,
+        'template': 'template',
+        'args': {'a': 'b'},
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_async_iterator(account_factory, report_factory):
+    renderer = PackRenderer(
+        'runtime',
+        'root_dir',
+        account_factory(),
+        report_factory(),
+        args={'prefetch_batch_size': 2, 'prefetch_batches': 1},
+    )
+
+    async def async_gen():
+        yield 1
+
+    async_data = async_gen()
+    assert renderer.get_async_iterator(async_data) is async_data
+
+    data = renderer.get_async_iterator(range(5))
+    assert data._batch_size == 2
+    assert [item async for item in data] == list(range(5))
@@ -0,0 +1,126 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+import asyncio
+from zipfile import ZipFile
+
+import pytest
+from fs.tempfs import TempFS
+
+from connect.reports.renderers.batch import (
+    BatchRenderer,
+    RenderJob,
+    render_batch,
+    render_batch_async,
+)
+from connect.reports.renderers.registry import RendererNotFoundError
+
+
+def _read_csv(output_file):
+    with ZipFile(output_file) as repzip:
+        with repzip.open('report.csv') as repfile:
+            return repfile.read().decode('utf-8').split()
+
+
+def test_render_batch(account_factory, report_factory):
+    with TempFS() as tmp_fs:
+        jobs = [
+            (account_factory(), report_factory(), [[f'line{i}']], f'{tmp_fs.root_path}/report{i}')
+            for i in range(5)
+        ]
+        results = render_batch('csv', 'runtime', tmp_fs.root_path, jobs, concurrency=2)
+
+        assert len(results) == 5
+        for i, result in enumerate(results):
+            assert result.ok
+            assert result.output_file == f'{tmp_fs.root_path}/report{i}.zip'
+            assert _read_csv(result.output_file) == [f'"line{i}"']
+
+
+def test_render_batch_collects_errors(mocker, account_factory, report_factory):
+    with TempFS() as tmp_fs:
+        jobs = [
+            RenderJob(account_factory(), report_factory(), [['line']], f'{tmp_fs.root_path}/ok'),
+            RenderJob(account_factory(), report_factory(), None, f'{tmp_fs.root_path}/ko'),
+        ]
+        results = render_batch('csv', 'runtime', tmp_fs.root_path, jobs)
+
+        assert results[0].ok
+        assert results[0].job is jobs[0]
+        assert not results[1].ok
+        assert results[1].output_file is None
+        assert isinstance(results[1].error, TypeError)
+
+
+def test_render_batch_extra_context(mocker, account_factory, report_factory):
+    mocked_set = mocker.patch(
+        'connect.reports.renderers.csv.CSVRenderer.set_extra_context',
+    )
+    with TempFS() as tmp_fs:
+        job = RenderJob(
+            account_factory(),
+            report_factory(),
+            [['line']],
+            f'{tmp_fs.root_path}/report',
+            extra_context={'key': 'value'},
+        )
+        render_batch('csv', 'runtime', tmp_fs.root_path, [job])
+
+    mocked_set.assert_called_once_with({'key': 'value'})
+
+
+def test_batch_renderer_not_found():
+    with pytest.raises(RendererNotFoundError):
+        BatchRenderer('unknown', 'runtime', 'root_dir')
+
+
+@pytest.mark.asyncio
+async def test_render_batch_async(account_factory, report_factory):
+    with TempFS() as tmp_fs:
+        jobs = [
+            (account_factory(), report_factory(), [[f'line{i}']], f'{tmp_fs.root_path}/report{i}')
+            for i in range(5)
+        ]
+        jobs.append(
+            (account_factory(), report_factory(), None, f'{tmp_fs.root_path}/ko'),
+        )
+        results = await render_batch_async(
+            'csv', 'runtime', tmp_fs.root_path, jobs, concurrency=2,
+        )
+
+        assert len(results) == 6
+        for i, result in enumerate(results[:5]):
+            assert result.ok
+            assert _read_csv(result.output_file) == [f'"line{i}"']
+        assert results[5].error is not None
+
+
+@pytest.mark.asyncio
+async def test_render_batch_async_concurrency(mocker, account_factory, report_factory):
+    running = 0
+    max_running = 0
+
+    async def render_async(self, data, output_file, start_time=None):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return output_file
+
+    mocker.patch(
+        'connect.reports.renderers.csv.CSVRenderer.render_async',
+        render_async,
+    )
+    jobs = [
+        (account_factory(), report_factory(), [], f'report{i}')
+        for i in range(10)
+    ]
+    results = await render_batch_async('csv', 'runtime', 'root_dir', jobs, concurrency=3)
+
+    assert [r.output_file for r in results] == [f'report{i}' for i in range(10)]
+    assert max_running == 3
+
+
+@pytest.mark.parametrize('concurrency', (0, -1, 1.5))
+def test_batch_renderer_invalid_concurrency(concurrency):
+    with pytest.raises(ValueError, match='`concurrency` must be a positive integer.'):
+        BatchRenderer('csv', 'runtime', 'root_dir', concurrency=concurrency)
@@ -1,4 +1,5 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
+import asyncio
 from zipfile import ZipFile
 
 import pytest
@@ -86,3 +87,87 @@ async def test_render_async_generator_sync(account_factory, report_factory):
                 content = repfile.read().decode('utf-8').split()
                 assert content[0] == f'"{data[0][0]}"'
                 assert content[1] == f'"{data[1][0]}"'
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 3, 1000))
+@pytest.mark.asyncio
+async def test_render_async_chunks(account_factory, report_factory, report_data, chunk_size):
+    data = report_data(5, 3)
+
+    async def async_generator():
+        for row in data:
+            yield row
+
+    with TempFS() as tmp_fs:
+        renderer = CSVRenderer(
+            'runtime',
+            tmp_fs.root_path,
+            account_factory(),
+            report_factory(),
+            args={'chunk_size': chunk_size},
+        )
+        async_file = await renderer.generate_report_async(
+            async_generator(),
+            f'{tmp_fs.root_path}/async_report',
+        )
+        sync_file = renderer.generate_report(data, f'{tmp_fs.root_path}/sync_report')
+
+        with open(async_file) as async_fp, open(sync_file) as sync_fp:
+            assert async_fp.read() == sync_fp.read()
+
+
+def test_render_async_chunks_write_once_per_chunk(mocker, account_factory, report_factory):
+    async def async_generator():
+        for idx in range(5):
+            yield [f'line{idx}']
+
+    with TempFS() as tmp_fs:
+        renderer = CSVRenderer(
+            'runtime',
+            tmp_fs.root_path,
+            account_factory(),
+            report_factory(),
+            args={'chunk_size': 2},
+        )
+        to_thread = mocker.spy(renderer, '_to_thread')
+        asyncio.run(
+            renderer.generate_report_async(async_generator(), f'{tmp_fs.root_path}/report'),
+        )
+
+        assert to_thread.call_count == 3
+
+
+@pytest.mark.parametrize('chunk_size', (0, -1, 'a'))
+def test_validate_invalid_chunk_size(chunk_size):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='csv',
+        description='description',
+        args={'chunk_size': chunk_size},
+    )
+
+    assert CSVRenderer.validate(defs) == ['`chunk_size` must be a positive integer.']
+
+
+@pytest.mark.parametrize('is_async', (False, True))
+def test_render_pack_streaming(account_factory, report_factory, report_data, is_async):
+    data = report_data(5, 3)
+    with TempFS() as tmp_fs:
+        renderer = CSVRenderer(
+            'runtime',
+            tmp_fs.root_path,
+            account_factory(),
+            report_factory(),
+        )
+        expected_file = renderer.generate_report(data, f'{tmp_fs.root_path}/expected')
+        renderer.args = {'pack_streaming': True, 'chunk_size': 2}
+        output_file = f'{tmp_fs.root_path}/report'
+        if is_async:
+            output_file = asyncio.run(renderer.render_async(data, output_file))
+        else:
+            output_file = renderer.render(data, output_file)
+
+        with ZipFile(output_file) as repzip, open(expected_file, 'rb') as fp:
+            assert repzip.namelist() == ['report.csv', 'summary.json']
+            assert repzip.read('report.csv') == fp.read()
@@ -0,0 +1,108 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from connect.reports.renderers import executor as executor_module
+from connect.reports.renderers.base import BaseRenderer
+from connect.reports.renderers.executor import (
+    ReportExecutor,
+    configure_default_executor,
+    get_default_executor,
+)
+from connect.reports.renderers.registry import get_renderer, register
+
+
+def test_executor_metrics():
+    executor = ReportExecutor(max_workers=1)
+    event = threading.Event()
+
+    first = executor.submit(event.wait)
+    second = executor.submit(lambda: 1 / 0)
+    assert executor.get_metrics()['pending'] == 2
+
+    event.set()
+    first.result()
+    with pytest.raises(ZeroDivisionError):
+        second.result()
+    executor.shutdown()
+
+    metrics = executor.get_metrics()
+    assert metrics['pending'] == 0
+    assert metrics['max_pending'] == 2
+    assert metrics['completed'] == 2
+    assert metrics['failed'] == 1
+    assert metrics['max_latency'] >= metrics['avg_latency'] > 0
+
+
+def test_executor_wraps_executor():
+    pool = ThreadPoolExecutor(max_workers=1)
+    executor = ReportExecutor(pool)
+
+    assert executor.submit(sum, [1, 2]).result() == 3
+    executor.shutdown()
+
+    assert pool._shutdown
+
+
+def test_executor_submit_error(mocker):
+    pool = mocker.MagicMock()
+    pool.submit.side_effect = RuntimeError
+    executor = ReportExecutor(pool)
+
+    with pytest.raises(RuntimeError):
+        executor.submit(sum, [1, 2])
+
+    assert executor.get_metrics()['pending'] == 0
+
+
+def test_default_executor(mocker):
+    mocker.patch.object(executor_module, '_default_executor', None)
+
+    default = get_default_executor()
+    assert get_default_executor() is default
+
+    new_default = configure_default_executor(max_workers=2)
+    assert get_default_executor() is new_default
+    assert new_default.executor._max_workers == 2
+    new_default.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_renderer_executor(registry, account_factory, report_factory):
+    @register('test')
+    class TestRenderer(BaseRenderer):
+        def generate_report(self, data, output_file):
+            pass
+
+        async def generate_report_async(self, data, output_file):
+            pass
+
+    executor = ReportExecutor(max_workers=1)
+    renderer = get_renderer(
+        'test', 'runtime', 'root_dir', account_factory(), report_factory(), executor=executor,
+    )
+
+    assert renderer.executor is executor
+    assert await renderer._to_thread(threading.current_thread) != threading.current_thread()
+    assert executor.get_metrics()['completed'] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_renderer_default_executor(mocker, account_factory, report_factory):
+    executor = ReportExecutor(max_workers=1)
+    mocker.patch.object(executor_module, '_default_executor', executor)
+
+    class TestRenderer(BaseRenderer):
+        def generate_report(self, data, output_file):
+            pass
+
+        async def generate_report_async(self, data, output_file):
+            pass
+
+    renderer = TestRenderer('runtime', 'root_dir', account_factory(), report_factory())
+    assert await renderer._to_thread(sum, [1, 2]) == 3
+    assert executor.get_metrics()['completed'] == 1
+    executor.shutdown()
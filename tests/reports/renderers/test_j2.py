@@ -1,5 +1,6 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 import csv
+import os
 from io import TextIOWrapper
 from zipfile import ZipFile
 
@@ -7,7 +8,8 @@ import pytest
 from fs.tempfs import TempFS
 
 from connect.reports.datamodels import RendererDefinition
-from connect.reports.renderers import Jinja2Renderer
+from connect.reports.renderers import Jinja2Renderer, j2
+from connect.reports.renderers.j2 import EnvironmentCache, configure_environment_cache
 
 
 def test_validate_ok(mocker):
@@ -196,3 +198,139 @@ async def test_render_async_tempfs_ok(report_data, account_factory, report_facto
     if extra_context:
         assert 'name' in ctx['extra_context']
         assert 'desc' in ctx['extra_context']
+
+
+def test_environment_cache_reuse():
+    cache = EnvironmentCache()
+
+    env = cache.get('root/templates')
+
+    assert cache.get('root/templates') is env
+    assert cache.get('root/templates', enable_async=True) is not env
+    assert cache.get('root/templates', enable_async=True).is_async
+    assert len(cache) == 2
+
+
+def test_environment_cache_lru_eviction():
+    cache = EnvironmentCache(max_size=2)
+
+    first = cache.get('first')
+    second = cache.get('second')
+    assert cache.get('first') is first
+    cache.get('third')
+
+    assert len(cache) == 2
+    assert cache.get('first') is first
+    assert cache.get('second') is not second
+
+
+def test_environment_cache_clear():
+    cache = EnvironmentCache()
+    env = cache.get('templates')
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get('templates') is not env
+
+
+def test_environment_cache_template_reloaded_on_change(account_factory, report_factory):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+    path_to_template = f'{tmp_fs.root_path}/package/report/template.txt.j2'
+    with open(path_to_template, 'w') as fp:
+        fp.write('first')
+    renderer = Jinja2Renderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='package/report/template.txt.j2',
+    )
+
+    template = renderer.get_template()
+    assert renderer.get_template() is template
+
+    with open(path_to_template, 'w') as fp:
+        fp.write('second')
+    stat = os.stat(path_to_template)
+    os.utime(path_to_template, (stat.st_atime, stat.st_mtime + 10))
+
+    output_file = renderer.generate_report([], f'{tmp_fs.root_path}/report')
+    with open(output_file) as fp:
+        assert fp.read() == 'second'
+
+
+def test_configure_environment_cache(mocker):
+    mocker.patch.object(j2, 'environment_cache', j2.environment_cache)
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('templates')
+    tmp_fs.writetext('templates/template.txt.j2', '{{ data }}')
+    bytecode_cache_dir = f'{tmp_fs.root_path}/bytecode'
+
+    configure_environment_cache(max_size=5, bytecode_cache_dir=bytecode_cache_dir)
+
+    assert j2.environment_cache.max_size == 5
+    j2.environment_cache.get(f'{tmp_fs.root_path}/templates').get_template('template.txt.j2')
+    assert os.listdir(bytecode_cache_dir)
+
+
+@pytest.mark.asyncio
+async def test_render_bytecode_cache_sync_then_async(
+    mocker, account_factory, report_factory, report_data,
+):
+    mocker.patch.object(j2, 'environment_cache', j2.environment_cache)
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+    tmp_fs.writetext(
+        'package/report/template.csv.j2',
+        '{% for item in data %}"{{item[0]}}";"{{item[1]}}"\n{% endfor %}',
+    )
+    bytecode_cache_dir = f'{tmp_fs.root_path}/bytecode'
+    renderer = Jinja2Renderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='package/report/template.csv.j2',
+    )
+    data = report_data(2, 2)
+    expected = ''.join(f'"{row[0]}";"{row[1]}"\n' for row in data)
+
+    configure_environment_cache(bytecode_cache_dir=bytecode_cache_dir)
+    renderer.generate_report(data, f'{tmp_fs.root_path}/sync_report')
+    # a fresh process only has the bytecode of the sync render on disk
+    configure_environment_cache(bytecode_cache_dir=bytecode_cache_dir)
+    output_file = await renderer.generate_report_async(data, f'{tmp_fs.root_path}/async_report')
+
+    with open(output_file) as fp:
+        assert fp.read() == expected
+    assert len(os.listdir(bytecode_cache_dir)) == 2
+
+
+@pytest.mark.asyncio
+async def test_render_pack_streaming(account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+    tmp_fs.writetext(
+        'package/report/template.csv.j2',
+        '{% for item in data %}"{{item[0]}}";"{{item[1]}}"\n{% endfor %}',
+    )
+    renderer = Jinja2Renderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='package/report/template.csv.j2',
+        args={'pack_streaming': True},
+    )
+    data = report_data(2, 2)
+    expected = ''.join(f'"{row[0]}";"{row[1]}"\n' for row in data).encode()
+
+    sync_file = renderer.render(data, f'{tmp_fs.root_path}/sync_report')
+    async_file = await renderer.render_async(data, f'{tmp_fs.root_path}/async_report')
+
+    for output_file in (sync_file, async_file):
+        with ZipFile(output_file) as repzip:
+            assert repzip.namelist() == ['report.csv', 'summary.json']
+            assert repzip.read('report.csv') == expected
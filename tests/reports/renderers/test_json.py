@@ -163,3 +163,134 @@ async def test_render_async_with_async_generator(account_factory, report_factory
         assert sorted(repzip.namelist()) == ['report.json', 'summary.json']
         with repzip.open('report.json') as repfile:
             assert repfile.read().decode('utf-8') == orjson.dumps(data).decode('utf-8')
+
+
+@pytest.mark.parametrize('buffer_size', (1, 10, 1024 * 1024))
+def test_generate_report_generator_buffered(account_factory, report_factory, buffer_size):
+    tmp_fs = TempFS()
+    data = [{'key': f'value_{idx}', 'idx': idx} for idx in range(10)]
+    renderer = JSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'buffer_size': buffer_size},
+    )
+    output_file = renderer.generate_report(
+        (item for item in data),
+        f'{tmp_fs.root_path}/report',
+    )
+    with open(output_file, 'rb') as fp:
+        assert fp.read() == orjson.dumps(data)
+
+
+@pytest.mark.parametrize('buffer_size', (1, 100, 1024 * 1024))
+@pytest.mark.asyncio
+async def test_generate_report_async_generator_buffered(
+    mocker, account_factory, report_factory, buffer_size,
+):
+    tmp_fs = TempFS()
+    data = [{'key': f'value_{idx}', 'idx': idx} for idx in range(10)]
+
+    async def async_gen():
+        for item in data:
+            yield item
+
+    renderer = JSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'buffer_size': buffer_size},
+    )
+    to_thread = mocker.spy(renderer, '_to_thread')
+    output_file = await renderer.generate_report_async(
+        async_gen(),
+        f'{tmp_fs.root_path}/report',
+    )
+    with open(output_file, 'rb') as fp:
+        assert fp.read() == orjson.dumps(data)
+    if buffer_size == 1:
+        assert to_thread.call_count == len(data) + 1
+    else:
+        assert to_thread.call_count < len(data)
+
+
+@pytest.mark.asyncio
+async def test_render_async_with_sync_generator(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = JSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = await renderer.generate_report_async(
+        ({'key': 'value'} for _ in range(3)),
+        f'{tmp_fs.root_path}/report',
+    )
+    with open(output_file, 'rb') as fp:
+        assert fp.read() == orjson.dumps([{'key': 'value'}] * 3)
+
+
+@pytest.mark.asyncio
+async def test_render_async_with_empty_async_generator(account_factory, report_factory):
+    tmp_fs = TempFS()
+
+    async def async_gen():
+        for item in []:
+            yield item
+
+    renderer = JSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = await renderer.generate_report_async(
+        async_gen(),
+        f'{tmp_fs.root_path}/report',
+    )
+    with open(output_file, 'rb') as fp:
+        assert fp.read() == b'[]'
+
+
+@pytest.mark.parametrize('buffer_size', (0, -1, 'a'))
+def test_validate_invalid_buffer_size(buffer_size):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='json',
+        description='description',
+        args={'buffer_size': buffer_size},
+    )
+
+    assert JSONRenderer.validate(defs) == ['`buffer_size` must be a positive integer.']
+
+
+@pytest.mark.asyncio
+async def test_render_pack_streaming(account_factory, report_factory):
+    tmp_fs = TempFS()
+    data = [{'key': f'value_{idx}'} for idx in range(10)]
+
+    async def async_gen():
+        for item in data:
+            yield item
+
+    renderer = JSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'pack_streaming': True, 'buffer_size': 10},
+    )
+    sync_file = renderer.render(
+        (item for item in data),
+        f'{tmp_fs.root_path}/sync_report',
+    )
+    async_file = await renderer.render_async(async_gen(), f'{tmp_fs.root_path}/async_report')
+
+    for output_file in (sync_file, async_file):
+        with ZipFile(output_file) as repzip:
+            assert repzip.namelist() == ['report.json', 'summary.json']
+            assert repzip.read('report.json') == orjson.dumps(data)
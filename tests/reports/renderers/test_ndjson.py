@@ -0,0 +1,186 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+import bz2
+import gzip
+import lzma
+from zipfile import ZipFile
+
+import orjson
+import pytest
+from fs.tempfs import TempFS
+
+from connect.reports.datamodels import RendererDefinition
+from connect.reports.renderers import NDJSONRenderer, get_renderer_class
+
+
+@pytest.mark.parametrize('args', (None, {}, {'compression': 'gzip', 'buffer_size': 10}))
+def test_validate_ok(args):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='ndjson',
+        description='description',
+        args=args,
+    )
+
+    assert NDJSONRenderer.validate(defs) == []
+
+
+@pytest.mark.parametrize(
+    ('args', 'error'),
+    (
+        ({'compression': 'zip'}, '`compression` must be one of gzip, bz2, xz.'),
+        ({'buffer_size': 0}, '`buffer_size` must be a positive integer.'),
+        ({'buffer_size': 'a'}, '`buffer_size` must be a positive integer.'),
+    ),
+)
+def test_validate_invalid_args(args, error):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='ndjson',
+        description='description',
+        args=args,
+    )
+
+    assert NDJSONRenderer.validate(defs) == [error]
+
+
+def test_registered():
+    assert get_renderer_class('ndjson') == NDJSONRenderer
+
+
+def test_render(account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    data = report_data(3, 2)
+    renderer = NDJSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = renderer.render(data, f'{tmp_fs.root_path}/report')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert sorted(repzip.namelist()) == ['report.ndjson', 'summary.json']
+        with repzip.open('report.ndjson') as repfile:
+            lines = repfile.read().splitlines()
+            assert [orjson.loads(line) for line in lines] == data
+
+
+def test_generate_report_dict(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = NDJSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = renderer.generate_report({'key': 'value'}, f'{tmp_fs.root_path}/report')
+
+    with open(output_file, 'rb') as fp:
+        assert fp.read() == b'{"key":"value"}\n'
+
+
+@pytest.mark.parametrize(
+    ('compression', 'ext', 'opener'),
+    (
+        ('gzip', 'gz', gzip.open),
+        ('bz2', 'bz2', bz2.open),
+        ('xz', 'xz', lzma.open),
+    ),
+)
+def test_generate_report_compressed(account_factory, report_factory, compression, ext, opener):
+    tmp_fs = TempFS()
+    data = [{'idx': idx} for idx in range(100)]
+    renderer = NDJSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'compression': compression, 'buffer_size': 64},
+    )
+    output_file = renderer.generate_report(
+        (item for item in data),
+        f'{tmp_fs.root_path}/report',
+    )
+
+    assert output_file == f'{tmp_fs.root_path}/report.ndjson.{ext}'
+    with opener(output_file, 'rb') as fp:
+        assert [orjson.loads(line) for line in fp.read().splitlines()] == data
+
+
+@pytest.mark.asyncio
+async def test_render_async_with_async_generator(account_factory, report_factory):
+    tmp_fs = TempFS()
+    data = [{'idx': idx} for idx in range(100)]
+
+    async def async_gen():
+        for item in data:
+            yield item
+
+    renderer = NDJSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'compression': 'gzip', 'buffer_size': 64},
+    )
+    output_file = await renderer.render_async(async_gen(), f'{tmp_fs.root_path}/report')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert sorted(repzip.namelist()) == ['report.ndjson.gz', 'summary.json']
+        content = gzip.decompress(repzip.read('report.ndjson.gz'))
+        assert [orjson.loads(line) for line in content.splitlines()] == data
+
+
+@pytest.mark.asyncio
+async def test_render_async_with_sync_generator(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = NDJSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = await renderer.generate_report_async(
+        ({'key': 'value'} for _ in range(2)),
+        f'{tmp_fs.root_path}/report',
+    )
+
+    with open(output_file, 'rb') as fp:
+        assert fp.read() == b'{"key":"value"}\n{"key":"value"}\n'
+
+
+@pytest.mark.parametrize('compression', (None, 'xz'))
+@pytest.mark.asyncio
+async def test_render_pack_streaming(account_factory, report_factory, compression):
+    tmp_fs = TempFS()
+    data = [{'idx': idx} for idx in range(10)]
+
+    async def async_gen():
+        for item in data:
+            yield item
+
+    args = {'pack_streaming': True, 'buffer_size': 10}
+    if compression:
+        args['compression'] = compression
+    renderer = NDJSONRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args=args,
+    )
+    sync_file = renderer.render(data, f'{tmp_fs.root_path}/sync_report')
+    async_file = await renderer.render_async(async_gen(), f'{tmp_fs.root_path}/async_report')
+
+    entry_name = 'report.ndjson.xz' if compression else 'report.ndjson'
+    for output_file in (sync_file, async_file):
+        with ZipFile(output_file) as repzip:
+            assert repzip.namelist() == [entry_name, 'summary.json']
+            content = repzip.read(entry_name)
+            if compression:
+                content = lzma.decompress(content)
+            assert [orjson.loads(line) for line in content.splitlines()] == data
@@ -0,0 +1,342 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+from zipfile import ZipFile
+
+import pytest
+from fs.tempfs import TempFS
+
+from connect.reports.datamodels import RendererDefinition
+from connect.reports.renderers import ParquetRenderer
+
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+@pytest.mark.parametrize(
+    'args',
+    (
+        None,
+        {},
+        {
+            'batch_size': 10,
+            'compression': 'zstd',
+            'schema': [{'name': 'id', 'type': 'string'}, {'name': 'amount', 'type': 'float64'}],
+        },
+        {'columns': ['id', 'amount']},
+    ),
+)
+def test_validate_ok(args):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='parquet',
+        description='description',
+        args=args,
+    )
+
+    assert ParquetRenderer.validate(defs) == []
+
+
+@pytest.mark.parametrize(
+    ('args', 'error'),
+    (
+        ({'batch_size': 0}, '`batch_size` must be a positive integer.'),
+        ({'batch_size': 'a'}, '`batch_size` must be a positive integer.'),
+        ({'columns': 'id'}, '`columns` must be a list of column names.'),
+        (
+            {'compression': 'zip'},
+            '`compression` must be one of none, snappy, gzip, brotli, lz4, zstd.',
+        ),
+        ({'schema': {'id': 'string'}}, '`schema` must be a list of columns.'),
+        ({'schema': [{'name': 'id'}]}, '`schema` columns must have `name` and `type`.'),
+        (
+            {'schema': [{'name': 'id', 'type': 'wrong'}]},
+            'invalid type `wrong` for column `id`.',
+        ),
+    ),
+)
+def test_validate_invalid_args(args, error):
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='parquet',
+        description='description',
+        args=args,
+    )
+
+    assert ParquetRenderer.validate(defs) == [error]
+
+
+def test_validate_pyarrow_missing(mocker):
+    mocker.patch('connect.reports.renderers.parquet.pa', None)
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='parquet',
+        description='description',
+    )
+
+    assert ParquetRenderer.validate(defs) == [
+        '`pyarrow` package is required for parquet renderer.',
+    ]
+
+
+def test_render(account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    data = report_data(5, 2)
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'batch_size': 2, 'columns': ['first', 'second']},
+    )
+    output_file = renderer.render(data, f'{tmp_fs.root_path}/report')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert sorted(repzip.namelist()) == ['report.parquet', 'summary.json']
+        repzip.extract('report.parquet', f'{tmp_fs.root_path}/extracted')
+
+    parquet_file = pq.ParquetFile(f'{tmp_fs.root_path}/extracted/report.parquet')
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column_names == ['first', 'second']
+    assert [list(row.values()) for row in table.to_pylist()] == data
+
+
+def test_generate_report_dicts_with_schema(account_factory, report_factory):
+    tmp_fs = TempFS()
+    data = [{'id': f'id_{idx}', 'amount': idx} for idx in range(5)]
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={
+            'schema': [{'name': 'id', 'type': 'string'}, {'name': 'amount', 'type': 'float64'}],
+        },
+    )
+    output_file = renderer.generate_report(
+        (item for item in data),
+        f'{tmp_fs.root_path}/report',
+    )
+
+    table = pq.read_table(output_file)
+    assert str(table.schema.field('amount').type) == 'double'
+    assert table.to_pylist() == [{'id': f'id_{idx}', 'amount': float(idx)} for idx in range(5)]
+
+
+def test_generate_report_infer_names(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = renderer.generate_report([[1, 'a'], [2, 'b']], f'{tmp_fs.root_path}/report')
+
+    table = pq.read_table(output_file)
+    assert table.to_pylist() == [
+        {'column_1': 1, 'column_2': 'a'},
+        {'column_1': 2, 'column_2': 'b'},
+    ]
+
+
+def test_generate_report_null_column_widened(account_factory, report_factory):
+    tmp_fs = TempFS()
+    data = [[1, None], [2, None], [3, 'c'], [4, None]]
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'batch_size': 2},
+    )
+    output_file = renderer.generate_report(data, f'{tmp_fs.root_path}/report')
+
+    parquet_file = pq.ParquetFile(output_file)
+    assert parquet_file.metadata.num_row_groups == 2
+    table = parquet_file.read()
+    assert str(table.schema.field('column_2').type) == 'string'
+    assert [list(row.values()) for row in table.to_pylist()] == data
+
+
+def test_generate_report_null_column_max_pending(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'batch_size': 1},
+    )
+
+    with pytest.raises(ValueError, match='`column_2`'):
+        renderer.generate_report(
+            [[idx, None] for idx in range(10)] + [[10, 'a']],
+            f'{tmp_fs.root_path}/report',
+        )
+
+
+def test_generate_report_truncated_value(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'batch_size': 2},
+    )
+
+    with pytest.raises(ValueError, match='values of column `column_2` do not match its type'):
+        renderer.generate_report([[1, 1], [2, 2], [3, 2.5]], f'{tmp_fs.root_path}/report')
+
+
+def test_generate_report_schema_casts_safely(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'schema': [{'name': 'amount', 'type': 'int64'}]},
+    )
+
+    output_file = renderer.generate_report([[1], [2.0]], f'{tmp_fs.root_path}/report')
+    assert pq.read_table(output_file).to_pylist() == [{'amount': 1}, {'amount': 2}]
+    with pytest.raises(ValueError, match='`amount`'):
+        renderer.generate_report([[1], [2.5]], f'{tmp_fs.root_path}/report')
+
+
+@pytest.mark.parametrize(
+    ('args', 'data', 'error'),
+    (
+        ({}, [[1, 'a', 3.0], [2, 'b']], 'rows must have 3 values, got 2.'),
+        ({'batch_size': 1}, [[1, 'a'], [2, 'b', 3.0]], 'rows must have 2 values, got 3.'),
+        ({'columns': ['id']}, [[1], [2, 'b']], 'rows must have 1 values, got 2.'),
+        ({}, [{'a': 1}, {'a': 2, 'c': 3, 'b': 4}], 'unknown columns in row: b, c.'),
+        ({'columns': ['a']}, [{'a': 1, 'b': 2}], 'unknown columns in row: b.'),
+    ),
+)
+def test_generate_report_ragged_rows(account_factory, report_factory, args, data, error):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args=args,
+    )
+
+    with pytest.raises(ValueError) as cv:
+        renderer.generate_report(data, f'{tmp_fs.root_path}/report')
+    assert str(cv.value) == error
+
+
+def test_generate_report_short_rows_padded(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'columns': ['id', 'name', 'amount']},
+    )
+    output_file = renderer.generate_report(
+        [[1, 'a', 3.0], [2, 'b']],
+        f'{tmp_fs.root_path}/report',
+    )
+
+    assert pq.read_table(output_file).to_pylist() == [
+        {'id': 1, 'name': 'a', 'amount': 3.0},
+        {'id': 2, 'name': 'b', 'amount': None},
+    ]
+
+
+def test_generate_report_no_data(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'schema': [{'name': 'id', 'type': 'string'}]},
+    )
+    output_file = renderer.generate_report([], f'{tmp_fs.root_path}/report')
+
+    table = pq.read_table(output_file)
+    assert table.num_rows == 0
+    assert table.column_names == ['id']
+
+
+@pytest.mark.asyncio
+async def test_render_async_with_async_generator(account_factory, report_factory):
+    tmp_fs = TempFS()
+    data = [{'id': f'id_{idx}', 'amount': idx} for idx in range(5)]
+
+    async def async_gen():
+        for item in data:
+            yield item
+
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'batch_size': 2},
+    )
+    output_file = await renderer.generate_report_async(async_gen(), f'{tmp_fs.root_path}/report')
+
+    parquet_file = pq.ParquetFile(output_file)
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().to_pylist() == data
+
+
+@pytest.mark.asyncio
+async def test_render_async_with_sync_data(account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    data = report_data(2, 2)
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = await renderer.render_async(data, f'{tmp_fs.root_path}/report')
+
+    assert output_file == f'{tmp_fs.root_path}/report.zip'
+    with ZipFile(output_file) as repzip:
+        assert sorted(repzip.namelist()) == ['report.parquet', 'summary.json']
+
+
+@pytest.mark.asyncio
+async def test_render_async_null_column_widened(account_factory, report_factory):
+    tmp_fs = TempFS()
+    data = [{'id': 1, 'name': None}, {'id': 2, 'name': 'b'}, {'id': 3, 'name': None}]
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        args={'batch_size': 1},
+    )
+    output_file = await renderer.generate_report_async(data, f'{tmp_fs.root_path}/report')
+
+    table = pq.read_table(output_file)
+    assert str(table.schema.field('name').type) == 'string'
+    assert table.to_pylist() == data
+
+
+@pytest.mark.asyncio
+async def test_render_async_no_data(account_factory, report_factory):
+    tmp_fs = TempFS()
+    renderer = ParquetRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+    )
+    output_file = await renderer.generate_report_async([], f'{tmp_fs.root_path}/report')
+
+    assert pq.read_table(output_file).num_rows == 0
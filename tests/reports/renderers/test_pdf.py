@@ -1,12 +1,20 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
+import io
+import os
 from zipfile import ZipFile
 
 import pytest
 from fs.tempfs import TempFS
 
+from connect.reports.cache import LRUCache
 from connect.reports.datamodels import RendererDefinition
-from connect.reports.renderers import PDFRenderer
-from connect.reports.renderers.pdf import local_fetcher
+from connect.reports.renderers import PDFRenderer, pdf
+from connect.reports.renderers.pdf import (
+    cached_url_fetcher,
+    configure_asset_cache,
+    get_stylesheet,
+    local_fetcher,
+)
 
 
 @pytest.mark.parametrize('args', (None, {}, {'css_file': 'my/css_file.css'}))
@@ -135,6 +143,124 @@ def test_generate_report_external_css(mocker, account_factory, report_factory, r
     html.write_pdf.assert_called_once_with('report.pdf', uncompressed_pdf=True, stylesheets=[css])
 
 
+def test_generate_report_in_memory(mocker, account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('report_dir')
+    tmp_fs.writetext('report_dir/template.html.j2', '<p>{{ data|length }}</p>')
+    html = mocker.MagicMock()
+    mocked_html = mocker.patch('connect.reports.renderers.pdf.HTML', return_value=html)
+    fetcher = mocker.MagicMock()
+    mocker.patch('connect.reports.renderers.pdf.partial', return_value=fetcher)
+
+    renderer = PDFRenderer(
+        'runtime environment', tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='report_dir/template.html.j2',
+        args={'in_memory': True},
+    )
+    output_file = f'{tmp_fs.root_path}/out/report.pdf'
+    assert renderer.generate_report(report_data(), output_file) == output_file
+
+    mocked_html.assert_called_once_with(
+        string='<p>10</p>',
+        base_url=f'{tmp_fs.root_path}/out/',
+        url_fetcher=fetcher,
+    )
+    html.write_pdf.assert_called_once_with(output_file, uncompressed_pdf=True)
+    assert not tmp_fs.exists('out/report.pdf.html')
+
+
+@pytest.mark.asyncio
+async def test_generate_report_async_in_memory(
+    mocker, account_factory, report_factory, report_data,
+):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('report_dir')
+    tmp_fs.writetext('report_dir/template.html.j2', '<p>{{ data|length }}</p>')
+    tmp_fs.writetext('report_dir/template.css', '')
+    html = mocker.MagicMock()
+    mocked_html = mocker.patch('connect.reports.renderers.pdf.HTML', return_value=html)
+    css = mocker.MagicMock()
+    mocker.patch('connect.reports.renderers.pdf.CSS', return_value=css)
+
+    renderer = PDFRenderer(
+        'runtime environment', tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='report_dir/template.html.j2',
+        args={'in_memory': True, 'css_file': 'report_dir/template.css'},
+    )
+    output_file = f'{tmp_fs.root_path}/report.pdf'
+    assert await renderer.generate_report_async(report_data(), output_file) == output_file
+
+    assert mocked_html.mock_calls[0].kwargs['string'] == '<p>10</p>'
+    assert mocked_html.mock_calls[0].kwargs['base_url'] == f'{tmp_fs.root_path}/'
+    html.write_pdf.assert_called_once_with(
+        output_file, uncompressed_pdf=True, stylesheets=[css],
+    )
+
+
+@pytest.mark.parametrize(
+    ('args', 'options'),
+    (
+        ({}, {'uncompressed_pdf': True}),
+        ({'compress_pdf': True}, {'uncompressed_pdf': False}),
+        (
+            {'compress_pdf': True, 'optimize_images': True, 'jpeg_quality': 80, 'dpi': 150},
+            {'uncompressed_pdf': False, 'optimize_images': True, 'jpeg_quality': 80, 'dpi': 150},
+        ),
+    ),
+)
+def test_generate_report_pdf_options(
+    mocker, account_factory, report_factory, report_data, args, options,
+):
+    mocker.patch(
+        'connect.reports.renderers.pdf.Jinja2Renderer.generate_report',
+        return_value='report.pdf.html',
+    )
+    html = mocker.MagicMock()
+    mocker.patch('connect.reports.renderers.pdf.HTML', return_value=html)
+
+    renderer = PDFRenderer(
+        'runtime environment', 'root_dir',
+        account_factory(),
+        report_factory(),
+        template='report_dir/template.html.j2',
+        args=args,
+    )
+    renderer.generate_report(report_data(), 'report.pdf')
+
+    html.write_pdf.assert_called_once_with('report.pdf', **options)
+
+
+@pytest.mark.parametrize(
+    ('args', 'error'),
+    (
+        ({'in_memory': 'yes'}, '`in_memory` must be boolean.'),
+        ({'compress_pdf': 1}, '`compress_pdf` must be boolean.'),
+        ({'optimize_images': 'no'}, '`optimize_images` must be boolean.'),
+        ({'jpeg_quality': 96}, '`jpeg_quality` must be an integer between 0 and 95.'),
+        ({'jpeg_quality': 'high'}, '`jpeg_quality` must be an integer between 0 and 95.'),
+        ({'dpi': 0}, '`dpi` must be a positive integer.'),
+        ({'dpi': 'a'}, '`dpi` must be a positive integer.'),
+    ),
+)
+def test_validate_invalid_args(mocker, args, error):
+    mocker.patch('connect.reports.renderers.pdf.os.path.isfile', return_value=True)
+
+    defs = RendererDefinition(
+        root_path='root_path',
+        id='renderer_id',
+        type='pdf',
+        description='description',
+        template='template.html.j2',
+        args=args,
+    )
+
+    assert PDFRenderer.validate(defs) == [error]
+
+
 def test_validate_tmpfs_template_wrong_name():
     tmp_fs = TempFS()
     tmp_fs.makedirs('package/report')
@@ -240,3 +366,100 @@ async def test_render_async_tmpfs_ok(report_data, account_factory, report_factor
         assert sorted(zip_file.namelist()) == ['report.pdf', 'summary.json']
         with zip_file.open('report.pdf', 'r') as fp:
             assert 'PDF Report' in str(fp.read())
+
+
+@pytest.fixture
+def asset_cache(mocker):
+    cache = LRUCache(1024)
+    mocker.patch('connect.reports.renderers.pdf.asset_cache', cache)
+    return cache
+
+
+def test_cached_url_fetcher(mocker, asset_cache):
+    tmp_fs = TempFS()
+    tmp_fs.writebytes('logo.png', b'image')
+    url = f'file://{tmp_fs.root_path}/logo.png'
+    def_fetcher = mocker.patch(
+        'connect.reports.renderers.pdf.default_url_fetcher',
+        side_effect=lambda url: {'file_obj': io.BytesIO(b'image'), 'mime_type': 'image/png'},
+    )
+
+    assert cached_url_fetcher(url) == {'string': b'image', 'mime_type': 'image/png'}
+    assert cached_url_fetcher(url) == {'string': b'image', 'mime_type': 'image/png'}
+
+    def_fetcher.assert_called_once_with(url)
+    assert asset_cache.hits == 1
+    assert asset_cache.size == 5
+
+
+def test_cached_url_fetcher_file_changed(mocker, asset_cache):
+    tmp_fs = TempFS()
+    tmp_fs.writebytes('logo.png', b'image')
+    url = f'file://{tmp_fs.root_path}/logo.png'
+    def_fetcher = mocker.patch(
+        'connect.reports.renderers.pdf.default_url_fetcher',
+        return_value={'string': b'image'},
+    )
+
+    cached_url_fetcher(url)
+    path = f'{tmp_fs.root_path}/logo.png'
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    cached_url_fetcher(url)
+
+    assert def_fetcher.call_count == 2
+
+
+@pytest.mark.parametrize('url', ('https://example.com/image.png', 'file:///not/found.png'))
+def test_cached_url_fetcher_not_cached(mocker, asset_cache, url):
+    def_fetcher = mocker.patch(
+        'connect.reports.renderers.pdf.default_url_fetcher',
+        return_value={'string': b'image'},
+    )
+
+    cached_url_fetcher(url)
+    cached_url_fetcher(url)
+
+    assert def_fetcher.call_count == 2
+    assert len(asset_cache) == 0
+
+
+def test_get_stylesheet(mocker, asset_cache):
+    tmp_fs = TempFS()
+    tmp_fs.writetext('style.css', 'body {}')
+    mocked_css = mocker.patch('connect.reports.renderers.pdf.CSS')
+    fetcher = mocker.MagicMock()
+
+    css = get_stylesheet(f'{tmp_fs.root_path}/style.css', fetcher)
+
+    assert get_stylesheet(f'{tmp_fs.root_path}/style.css', fetcher) is css
+    mocked_css.assert_called_once_with(
+        filename=f'{tmp_fs.root_path}/style.css', url_fetcher=fetcher,
+    )
+
+
+def test_configure_asset_cache(mocker):
+    mocker.patch.object(pdf, 'asset_cache', pdf.asset_cache)
+
+    configure_asset_cache(max_size=10)
+
+    assert pdf.asset_cache.max_size == 10
+
+
+def test_render_pack_streaming_fallback(mocker, account_factory, report_factory, report_data):
+    renderer = PDFRenderer(
+        'runtime environment', 'root_dir',
+        account_factory(),
+        report_factory(),
+        template='report_dir/template.html.j2',
+        args={'pack_streaming': True},
+    )
+    mocked_render_stream = mocker.patch.object(renderer, 'render_stream')
+    mocker.patch.object(renderer, 'generate_report', return_value='report.pdf')
+    mocker.patch.object(renderer, 'generate_summary', return_value='summary.json')
+    mocked_pack = mocker.patch.object(renderer, 'pack_files', return_value='report.zip')
+
+    assert renderer.get_stream_entry_name() is None
+    assert renderer.render(report_data(), 'report') == 'report.zip'
+    mocked_render_stream.assert_not_called()
+    mocked_pack.assert_called_once()
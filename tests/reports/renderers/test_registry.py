@@ -1,5 +1,9 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import subprocess
+import sys
+import types
+
 import pytest
 
 from connect.reports.renderers.base import BaseRenderer
@@ -10,6 +14,7 @@ from connect.reports.renderers.registry import (
     get_renderer_class,
     get_renderers,
     register,
+    register_lazy,
 )
 
 
@@ -88,3 +93,104 @@ def test_renderers():
 
     renderers = get_renderers()
     assert 'new_one' in renderers
+
+
+@pytest.fixture
+def lazy_registry(mocker):
+    data = {}
+    mocker.patch('connect.reports.renderers.registry._LAZY_RENDERERS', data)
+    return data
+
+
+def test_register_lazy(mocker, registry, lazy_registry):
+    module = types.ModuleType('lazy_renderer_module')
+
+    def _import_module(name):
+        @register('lazy')
+        class LazyRenderer(BaseRenderer):
+            __module__ = 'lazy_renderer_module'
+
+        module.LazyRenderer = LazyRenderer
+        return module
+
+    mocked_import = mocker.patch(
+        'connect.reports.renderers.registry.importlib.import_module',
+        side_effect=_import_module,
+    )
+
+    register_lazy('lazy', 'lazy_renderer_module')
+
+    assert 'lazy' in get_renderers()
+    mocked_import.assert_not_called()
+
+    assert get_renderer_class('lazy') is module.LazyRenderer
+    assert get_renderer_class('lazy') is module.LazyRenderer
+    mocked_import.assert_called_once_with('lazy_renderer_module')
+
+
+def test_register_lazy_already_registered(registry, lazy_registry):
+    register_lazy('lazy', 'lazy_renderer_module')
+
+    with pytest.raises(RendererAlreadyRegisteredError):
+        register_lazy('lazy', 'another_module')
+
+
+def test_register_lazy_name_from_another_module(registry, lazy_registry):
+    register_lazy('lazy', 'lazy_renderer_module')
+
+    with pytest.raises(RendererAlreadyRegisteredError):
+        @register('lazy')
+        class OtherRenderer(BaseRenderer):
+            pass
+    assert 'lazy' not in registry
+
+
+def test_register_builtin_name():
+    with pytest.raises(RendererAlreadyRegisteredError):
+        @register('csv')
+        class OtherCSVRenderer(BaseRenderer):
+            pass
+
+    from connect.reports.renderers import CSVRenderer
+    assert get_renderer_class('csv') is CSVRenderer
+
+
+def test_register_lazy_module_without_renderer(mocker, registry, lazy_registry):
+    mocker.patch('connect.reports.renderers.registry.importlib.import_module')
+    register_lazy('lazy', 'lazy_renderer_module')
+
+    with pytest.raises(RendererNotFoundError):
+        get_renderer_class('lazy')
+
+
+def test_builtin_renderers():
+    assert {'csv', 'jinja2', 'json', 'ndjson', 'parquet', 'pdf', 'xlsx'} <= set(get_renderers())
+
+
+def test_validator_import_does_not_load_renderers():
+    script = (
+        'import sys\n'
+        'import connect.reports.validator\n'
+        'from connect.reports.renderers import get_renderers\n'
+        'assert "xlsx" in get_renderers()\n'
+        'print(",".join(m for m in ("weasyprint", "openpyxl", "jinja2", "orjson") '
+        'if m in sys.modules))\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == ''
+
+
+def test_lazy_attributes():
+    from connect.reports import renderers
+    from connect.reports.renderers.csv import CSVRenderer
+
+    assert renderers.CSVRenderer is CSVRenderer
+    assert 'XLSXRenderer' in dir(renderers)
+    with pytest.raises(AttributeError):
+        renderers.UnknownRenderer
@@ -0,0 +1,131 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+import asyncio
+import threading
+
+import pytest
+
+from connect.reports.renderers.executor import ReportExecutor
+from connect.reports.renderers.utils import aiter, chunks
+
+
+def test_chunks():
+    assert list(chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunks([], 2)) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('batch_size', (1, 3, 100))
+async def test_aiter(batch_size):
+    assert [item async for item in aiter(range(10), batch_size=batch_size)] == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_aiter_empty():
+    assert [item async for item in aiter([])] == []
+
+
+@pytest.mark.asyncio
+async def test_aiter_produces_in_worker_thread():
+    threads = set()
+
+    def gen():
+        for i in range(3):
+            threads.add(threading.current_thread())
+            yield i
+
+    assert [item async for item in aiter(gen())] == [0, 1, 2]
+    assert threads and threading.current_thread() not in threads
+
+
+@pytest.mark.asyncio
+async def test_aiter_bounded_prefetch():
+    produced = []
+
+    def gen():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    data = aiter(gen(), batch_size=5, prefetch=2)
+    assert await data.__anext__() == 0
+    await asyncio.sleep(0.1)
+
+    # the consumed batch, the prefetched ones and the one being produced
+    assert len(produced) <= 5 * 4
+    data.close()
+
+
+@pytest.mark.asyncio
+async def test_aiter_error():
+    def gen():
+        yield 1
+        raise ValueError('broken cursor')
+
+    data = aiter(gen(), batch_size=1)
+    assert await data.__anext__() == 1
+    with pytest.raises(ValueError, match='broken cursor'):
+        await data.__anext__()
+    with pytest.raises(StopAsyncIteration):
+        await data.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_aiter_close_stops_producer():
+    produced = []
+
+    def gen():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    data = aiter(gen(), batch_size=1, prefetch=1)
+    assert await data.__anext__() == 0
+    data.close()
+    await asyncio.sleep(0.1)
+
+    assert data._producer.done()
+    assert len(produced) <= 3
+    with pytest.raises(StopAsyncIteration):
+        await data.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_aiter_runtime_error():
+    def gen():
+        yield 1
+        raise RuntimeError('broken source')
+
+    result = []
+    with pytest.raises(RuntimeError, match='broken source'):
+        async for item in aiter(gen()):
+            result.append(item)
+    assert result == []
+
+
+@pytest.mark.asyncio
+async def test_aiter_generator_stop_iteration():
+    def gen():
+        yield 1
+        raise StopIteration
+
+    with pytest.raises(RuntimeError, match='generator raised StopIteration'):
+        await asyncio.wait_for(
+            asyncio.ensure_future(_consume(aiter(gen(), batch_size=1))),
+            timeout=5,
+        )
+
+
+async def _consume(values):
+    return [value async for value in values]
+
+
+@pytest.mark.asyncio
+async def test_aiter_uses_executor():
+    executor = ReportExecutor(max_workers=1)
+    try:
+        data = aiter(range(10), batch_size=3, executor=executor)
+        assert await _consume(data) == list(range(10))
+        # 4 batches and the empty one closing the iteration
+        assert executor.get_metrics()['completed'] == 5
+    finally:
+        executor.shutdown()
@@ -1,13 +1,25 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from zipfile import ZipFile
 
 import pytest
 from fs.tempfs import TempFS
 from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
 
+from connect.reports.cache import LRUCache
 from connect.reports.datamodels import RendererDefinition
 from connect.reports.renderers import XLSXRenderer
+from connect.reports.renderers.xlsx import (
+    configure_template_cache,
+    get_template_sheet_names,
+    load_template,
+)
 
 
 @pytest.mark.parametrize('args', (None, {}, {'start_row': 1, 'start_col': 1}))
@@ -59,6 +71,9 @@ def test_validate_template_not_found(mocker):
         ({'start_row': -3}, '`start_row` must be greater than 0.'),
         ({'start_col': 0}, '`start_col` must be greater than 0.'),
         ({'start_col': -3}, '`start_col` must be greater than 0.'),
+        ({'streaming': 'yes'}, '`streaming` must be boolean.'),
+        ({'chunk_size': 0}, '`chunk_size` must be a positive integer.'),
+        ({'chunk_size': 'a'}, '`chunk_size` must be a positive integer.'),
     ),
 )
 def test_validate_invalid_args(mocker, args, error):
@@ -127,6 +142,59 @@ def test_validate_template_not_valid():
     assert 'not valid or empty' in errors[0]
 
 
+@pytest.mark.parametrize(
+    'files',
+    (
+        {'other.txt': 'content'},
+        {'xl/workbook.xml': 'not xml <'},
+    ),
+)
+def test_validate_template_not_valid_zip(files):
+    tmp_fs = TempFS()
+    with ZipFile(f'{tmp_fs.root_path}/test.xlsx', 'w') as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+
+    defs = RendererDefinition(
+        root_path=tmp_fs.root_path,
+        id='renderer_id',
+        type='xlsx',
+        description='description',
+        template='test.xlsx',
+    )
+
+    assert XLSXRenderer.validate(defs) == ['template `test.xlsx` not valid or empty.']
+
+
+def test_validate_template_no_data_sheet():
+    tmp_fs = TempFS()
+    wb = Workbook()
+    wb.active.title = 'Sheet'
+    wb.save(f'{tmp_fs.root_path}/test.xlsx')
+
+    defs = RendererDefinition(
+        root_path=tmp_fs.root_path,
+        id='renderer_id',
+        type='xlsx',
+        description='description',
+        template='test.xlsx',
+    )
+
+    assert XLSXRenderer.validate(defs) == ['template `test.xlsx` has no `Data` sheet.']
+
+
+def test_get_template_sheet_names(mocker):
+    tmp_fs = TempFS()
+    wb = Workbook()
+    wb.active.title = 'Data'
+    wb.create_sheet('Notes')
+    wb.save(f'{tmp_fs.root_path}/test.xlsx')
+    mocked_load = mocker.patch('connect.reports.renderers.xlsx.load_workbook')
+
+    assert get_template_sheet_names(f'{tmp_fs.root_path}/test.xlsx') == ['Data', 'Notes']
+    mocked_load.assert_not_called()
+
+
 def test_render_tmpfs_ok(account_factory, report_factory, report_data):
     tmp_fs = TempFS()
     tmp_fs.makedirs('package/report')
@@ -235,6 +303,141 @@ async def test_render_async_with_sync_data(account_factory, report_factory, repo
     assert data == [[ws[f'A{item}'].value, ws[f'B{item}'].value] for item in range(2, 4)]
 
 
+def test_render_streaming_tmpfs_ok(account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.cell(1, 1, value='Title')
+    ws.merge_cells('A1:C1')
+    ws.cell(2, 2, value='Name').font = Font(bold=True)
+    ws.cell(2, 3, value='Description')
+    ws.cell(4, 2, value='overwritten')
+    ws.column_dimensions['B'].width = 42
+    ws.freeze_panes = 'B3'
+    extra = wb.create_sheet('Notes')
+    extra.cell(1, 1, value='Some notes')
+    wb.save(f'{tmp_fs.root_path}/package/report/template.xlsx')
+
+    renderer = XLSXRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='package/report/template.xlsx',
+        args={'start_row': 3, 'start_col': 2, 'streaming': True},
+    )
+
+    data = report_data(2, 2)
+    path_to_output = f'{tmp_fs.root_path}/package/report/report'
+    output_file = renderer.render(data, path_to_output, start_time=datetime.now())
+
+    wb = load_workbook(output_file)
+    ws = wb['Data']
+
+    assert output_file == f'{path_to_output}.xlsx'
+    assert wb.sheetnames == ['Data', 'Notes', 'Info']
+    assert ws['A1'].value == 'Title'
+    assert 'A1:C1' in ws.merged_cells
+    assert ws['B2'].value == 'Name'
+    assert ws['B2'].font.bold is True
+    assert ws.column_dimensions['B'].width == 42
+    assert ws.freeze_panes == 'B3'
+    assert ws.max_row == 4
+    assert data == [[ws[f'B{item}'].value, ws[f'C{item}'].value] for item in range(3, 5)]
+    assert wb['Notes']['A1'].value == 'Some notes'
+    assert wb['Info']['A4'].value == 'Account ID'
+    assert wb['Info']['B4'].value == 'VA-000'
+    assert 'A1:B1' in wb['Info'].merged_cells
+
+
+@pytest.mark.asyncio
+async def test_render_async_streaming_tmpfs_ok(account_factory, report_factory, report_data):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.cell(1, 1, value='Name')
+    ws.cell(1, 2, value='Description')
+    wb.save(f'{tmp_fs.root_path}/package/report/template.xlsx')
+
+    renderer = XLSXRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='package/report/template.xlsx',
+        args={'streaming': True},
+    )
+
+    data = report_data(2, 2)
+
+    async def async_gen(cols, rows):
+        for element in report_data(cols, rows):
+            yield element
+
+    path_to_output = f'{tmp_fs.root_path}/package/report/report'
+    output_file = await renderer.render_async(
+        async_gen(2, 2),
+        path_to_output,
+        start_time=datetime.now(),
+    )
+    wb = load_workbook(output_file)
+    ws = wb['Data']
+
+    assert output_file == f'{path_to_output}.xlsx'
+    assert ws['A1'].value == 'Name'
+    assert data == [[ws[f'A{item}'].value, ws[f'B{item}'].value] for item in range(2, 4)]
+    assert wb['Info']['A2'].value == 'Report Start time'
+
+
+@pytest.mark.asyncio
+async def test_render_async_process_executor(
+    mocker, account_factory, report_factory, report_data,
+):
+    # the report must be generated by the worker process only
+    mocker.patch.object(
+        XLSXRenderer,
+        'generate_report_async',
+        side_effect=AssertionError('rendered in the event loop process'),
+    )
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+    _create_xlsx_doc(f'{tmp_fs.root_path}/package/report/template.xlsx')
+
+    async def async_gen():
+        for element in report_data(2, 2):
+            yield element
+
+    with ProcessPoolExecutor(max_workers=1) as process_executor:
+        renderer = XLSXRenderer(
+            'runtime',
+            tmp_fs.root_path,
+            account_factory(),
+            report_factory(),
+            template='package/report/template.xlsx',
+            args={'start_row': 20},
+            process_executor=process_executor,
+        )
+        path_to_output = f'{tmp_fs.root_path}/package/report/report'
+        output_file = await renderer.render_async(
+            async_gen(),
+            path_to_output,
+            start_time=datetime.now(),
+        )
+
+    wb = load_workbook(output_file)
+    ws = wb['Data']
+
+    assert output_file == f'{path_to_output}.xlsx'
+    assert report_data(2, 2) == [[ws[f'A{idx}'].value, ws[f'B{idx}'].value] for idx in (20, 21)]
+    assert wb['Info']['B4'].value == 'VA-000'
+
+
 def _create_xlsx_doc(xlsx_path):
     wb = Workbook()
     ws = wb.active
@@ -242,3 +445,163 @@ def _create_xlsx_doc(xlsx_path):
     for _ in range(1, 10):
         ws.append(range(10))
     wb.save(xlsx_path)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('streaming', (False, True))
+async def test_render_async_keeps_event_loop_responsive(
+    account_factory, report_factory, streaming,
+):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('package/report')
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.cell(1, 1, value='Name')
+    wb.save(f'{tmp_fs.root_path}/package/report/template.xlsx')
+
+    renderer = XLSXRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='package/report/template.xlsx',
+        args={'streaming': streaming, 'chunk_size': 500},
+    )
+
+    data = [[f'value{i}', i, i * 2, i * 3] for i in range(20000)]
+    done = False
+    ticks = []
+
+    async def ticker():
+        while not done:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0)
+
+    ticker_task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    try:
+        output_file = await renderer.render_async(
+            data,
+            f'{tmp_fs.root_path}/package/report/report',
+            start_time=datetime.now(),
+        )
+    finally:
+        done = True
+        await ticker_task
+
+    # without executor chunks the loop would stall for the whole population.
+    max_gap = max(b - a for a, b in zip(ticks, ticks[1:]))
+    assert max_gap < 0.2
+    ws = load_workbook(output_file)['Data']
+    assert ws.max_row == len(data) + 1
+
+
+@pytest.fixture
+def template_cache(mocker):
+    cache = LRUCache(64 * 1024 * 1024)
+    mocker.patch('connect.reports.renderers.xlsx.template_cache', cache)
+    return cache
+
+
+def _save_template(path, value='Name'):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.cell(1, 1, value=value)
+    ws.cell(1, 1).font = Font(bold=True)
+    wb.save(path)
+
+
+def test_load_template_cached(mocker, template_cache):
+    tmp_fs = TempFS()
+    path = f'{tmp_fs.root_path}/template.xlsx'
+    _save_template(path)
+    mocked_load = mocker.patch(
+        'connect.reports.renderers.xlsx.load_workbook',
+        wraps=load_workbook,
+    )
+
+    first = load_template(path)
+    first['Data'].cell(2, 1, value='changed')
+    second = load_template(path)
+    third = load_template(path)
+
+    mocked_load.assert_called_once_with(path)
+    assert template_cache.misses == 1
+    assert template_cache.hits == 2
+    assert second is not third
+    assert second['Data']['A1'].value == 'Name'
+    assert second['Data']['A1'].font.b is True
+    assert second['Data']['A2'].value is None
+
+
+def test_load_template_invalidated_on_change(template_cache):
+    tmp_fs = TempFS()
+    path = f'{tmp_fs.root_path}/template.xlsx'
+    _save_template(path)
+    assert load_template(path)['Data']['A1'].value == 'Name'
+
+    _save_template(path, value='Other')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert load_template(path)['Data']['A1'].value == 'Other'
+    assert template_cache.misses == 2
+
+
+def test_load_template_eviction(mocker):
+    tmp_fs = TempFS()
+    paths = [f'{tmp_fs.root_path}/template{i}.xlsx' for i in range(3)]
+    for path in paths:
+        _save_template(path)
+    cache = LRUCache(1)
+    mocker.patch('connect.reports.renderers.xlsx.template_cache', cache)
+
+    for path in paths:
+        load_template(path)
+
+    assert len(cache) == 0
+
+
+def test_load_template_not_found(template_cache):
+    with pytest.raises(FileNotFoundError):
+        load_template('not_found.xlsx')
+
+
+def test_render_uses_template_cache(account_factory, report_factory, template_cache):
+    tmp_fs = TempFS()
+    _save_template(f'{tmp_fs.root_path}/template.xlsx')
+
+    defs = RendererDefinition(
+        root_path=tmp_fs.root_path,
+        id='renderer_id',
+        type='xlsx',
+        description='description',
+        template='template.xlsx',
+    )
+    assert XLSXRenderer.validate(defs) == []
+
+    renderer = XLSXRenderer(
+        'runtime',
+        tmp_fs.root_path,
+        account_factory(),
+        report_factory(),
+        template='template.xlsx',
+    )
+    for idx in range(2):
+        output_file = renderer.render([['value']], f'{tmp_fs.root_path}/report{idx}')
+        assert load_workbook(output_file)['Data']['A2'].value == 'value'
+
+    assert template_cache.misses == 1
+    assert template_cache.hits == 1
+
+
+def test_configure_template_cache(mocker):
+    mocker.patch('connect.reports.renderers.xlsx.template_cache', None)
+
+    configure_template_cache(max_size=10)
+
+    from connect.reports.renderers import xlsx
+    assert xlsx.template_cache.max_size == 10
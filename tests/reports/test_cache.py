@@ -0,0 +1,70 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+from connect.reports.cache import LRUCache
+
+
+def test_get_set():
+    cache = LRUCache(10)
+
+    assert cache.get('key') is None
+    assert cache.get('key', 'default') == 'default'
+    cache.set('key', 'value')
+
+    assert cache.get('key') == 'value'
+    assert 'key' in cache
+    assert len(cache) == 1
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_eviction_by_size():
+    cache = LRUCache(10)
+    cache.set('a', 'a', size=4)
+    cache.set('b', 'b', size=4)
+    cache.get('a')
+    cache.set('c', 'c', size=4)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.size == 8
+
+
+def test_replace_entry():
+    cache = LRUCache(10)
+    cache.set('a', 'a', size=4)
+    cache.set('a', 'b', size=6)
+
+    assert cache.get('a') == 'b'
+    assert cache.size == 6
+
+
+def test_entry_too_big():
+    cache = LRUCache(10)
+    cache.set('a', 'a', size=11)
+
+    assert 'a' not in cache
+    assert cache.size == 0
+
+
+def test_clear():
+    cache = LRUCache(10)
+    cache.set('a', 'a')
+    cache.get('a')
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.size == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_max_entry_size():
+    cache = LRUCache(10, max_entry_size=4)
+    cache.set('a', 'a', size=4)
+    cache.set('b', 'b', size=5)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.max_entry_size == 4
+    assert LRUCache(10, max_entry_size=20).max_entry_size == 10
@@ -1,15 +1,35 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import gc
 import os
+import pickle
+import weakref
+from dataclasses import FrozenInstanceError, asdict
 
+import orjson
 import pytest
 from fs.tempfs import TempFS
 
+from connect.reports.cache import LRUCache
 from connect.reports.datamodels import (
+    Account,
+    ChoicesParameterDefinition,
+    FrozenAccount,
+    FrozenReportDefinition,
     ParameterDefinition,
     RendererDefinition,
     ReportDefinition,
     RepositoryDefinition,
+    SlottedChoicesParameterDefinition,
+    SlottedParameterDefinition,
+    SlottedRendererDefinition,
+    SlottedReportDefinition,
+    configure_description_cache,
+    configure_serialization_cache,
+    dump_catalogue,
+    invalidate_serializations,
+    read_description,
+    slotted,
 )
 
 
@@ -157,3 +177,365 @@ def test_report_get_renderers_multiple(mocker, report_v2_json, renderer_json):
     for renderer in data:
         if renderer['default']:
             assert renderer['id'] == 'json_renderer'
+
+
+@pytest.mark.parametrize('frozen', (False, True))
+def test_slotted_report_definition(report_v2_json, renderer_json, param_json, frozen):
+    report_cls = slotted(ReportDefinition, frozen=frozen)
+    renderer_cls = slotted(RendererDefinition, frozen=frozen)
+    param_cls = slotted(ParameterDefinition, frozen=frozen)
+    param = param_json()
+    report_json = report_v2_json(
+        entrypoint='rootpkg.reportmodule.entrypoint',
+        renderers=[renderer_cls(root_path='root_path', **renderer_json())],
+        parameters=[param_cls(**param)],
+    )
+
+    defs = report_cls(root_path='root_path', **report_json)
+
+    assert not hasattr(defs, '__dict__')
+    assert defs.local_id == 'reportmodule'
+    assert defs.default_renderer == defs.renderers[0].id
+    assert defs.get_parameters() == [param]
+    assert defs.get_renderers() == ReportDefinition(
+        root_path='root_path',
+        **report_v2_json(
+            renderers=[RendererDefinition(root_path='root_path', **renderer_json())],
+        ),
+    ).get_renderers()
+    assert pickle.loads(pickle.dumps(defs)) == defs
+
+
+def test_slotted_models_cached():
+    assert slotted(ReportDefinition) is SlottedReportDefinition
+    assert slotted(ReportDefinition, frozen=True) is FrozenReportDefinition
+    assert SlottedReportDefinition.__name__ == 'SlottedReportDefinition'
+    assert SlottedReportDefinition.__module__ == 'connect.reports.datamodels'
+
+
+def test_slotted_choices_parameter_definition():
+    param = SlottedChoicesParameterDefinition(
+        id='id', type='choice', name='name', description='description',
+        choices=[{'value': 'v', 'label': 'l'}],
+    )
+
+    assert isinstance(param, SlottedParameterDefinition)
+    assert not hasattr(param, '__dict__')
+    assert param.required is False
+    assert param.choices == [{'value': 'v', 'label': 'l'}]
+    assert SlottedChoicesParameterDefinition(
+        id='id', type='choice', name='name', description='description',
+    ).choices == []
+
+
+def test_slotted_defaults():
+    renderer = SlottedRendererDefinition(
+        root_path='root_path', id='id', type='csv', description='description',
+    )
+
+    assert renderer.default is False
+    assert renderer.template is None
+    assert renderer.args is None
+    renderer.default = True
+    assert renderer.default is True
+    with pytest.raises(AttributeError):
+        renderer.unknown = 'value'
+
+
+def test_frozen_account():
+    account = FrozenAccount(id='VA-000', name='vendor account')
+
+    with pytest.raises(FrozenInstanceError):
+        account.id = 'VA-001'
+    assert hash(account) == hash(FrozenAccount(id='VA-000', name='vendor account'))
+    assert len({account, FrozenAccount(id='VA-000', name='vendor account')}) == 1
+    assert pickle.loads(pickle.dumps(account)) == account
+    assert account == Account(id='VA-000', name='vendor account')
+    assert account != Account(id='VA-001', name='vendor account')
+    with pytest.raises(FrozenInstanceError):
+        del account.name
+
+
+@pytest.mark.parametrize('frozen', (False, True))
+def test_slotted_variants_are_virtual_subclasses(frozen):
+    param_cls = slotted(ChoicesParameterDefinition, frozen=frozen)
+    param = param_cls(id='id', type='choice', name='name', description='description')
+    plain = ChoicesParameterDefinition(
+        id='id', type='choice', name='name', description='description',
+    )
+
+    assert isinstance(param, ChoicesParameterDefinition)
+    assert isinstance(param, ParameterDefinition)
+    assert not isinstance(param, ReportDefinition)
+    assert issubclass(param_cls, ParameterDefinition)
+    assert param == plain
+    assert plain == param
+    assert param != ParameterDefinition(
+        id='id', type='choice', name='name', description='description',
+    )
+    assert pickle.loads(pickle.dumps(param)) == param
+
+
+def test_slotted_choices_parameter_frozen_base():
+    assert issubclass(
+        slotted(ChoicesParameterDefinition, frozen=True),
+        slotted(ParameterDefinition, frozen=True),
+    )
+
+
+@pytest.fixture
+def description_cache(mocker):
+    cache = LRUCache(1024, max_entry_size=64)
+    mocker.patch('connect.reports.datamodels.description_cache', cache)
+    return cache
+
+
+def test_report_description_cached(mocker, report_v2_json, description_cache):
+    tmp_fs = TempFS()
+    tmp_fs.writetext('readme.md', 'Report description')
+    defs = ReportDefinition(
+        root_path=tmp_fs.root_path,
+        **report_v2_json(readme_file='readme.md'),
+    )
+    mocked_open = mocker.patch('connect.reports.datamodels.open', wraps=open)
+
+    assert defs.description == 'Report description'
+    assert defs.description == 'Report description'
+
+    mocked_open.assert_called_once()
+    assert description_cache.misses == 1
+    assert description_cache.hits == 1
+
+
+def test_description_invalidated_on_change(description_cache):
+    tmp_fs = TempFS()
+    tmp_fs.writetext('readme.md', 'First')
+    path = os.path.join(tmp_fs.root_path, 'readme.md')
+    assert read_description(path) == 'First'
+
+    tmp_fs.writetext('readme.md', 'Second')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert read_description(path) == 'Second'
+    assert description_cache.misses == 2
+
+
+def test_description_big_readme_not_cached(mocker, description_cache):
+    tmp_fs = TempFS()
+    tmp_fs.writetext('readme.md', 'x' * 100)
+    path = os.path.join(tmp_fs.root_path, 'readme.md')
+
+    assert read_description(path) == 'x' * 100
+    assert read_description(path) == 'x' * 100
+    assert len(description_cache) == 0
+    assert description_cache.misses == 0
+
+
+def test_description_not_found(description_cache):
+    with pytest.raises(FileNotFoundError):
+        read_description('not_found.md')
+
+
+def test_configure_description_cache(mocker):
+    mocker.patch('connect.reports.datamodels.description_cache', None)
+
+    configure_description_cache(max_size=10, max_entry_size=5)
+
+    from connect.reports import datamodels
+    assert datamodels.description_cache.max_size == 10
+    assert datamodels.description_cache.max_entry_size == 5
+
+
+@pytest.fixture
+def serialization_cache(mocker):
+    cache = LRUCache(1024 * 1024)
+    mocker.patch('connect.reports.datamodels.serialization_cache', cache)
+    return cache
+
+
+def _create_report(root_path, report_v2_json, renderer_json, param_json, **kwargs):
+    return ReportDefinition(
+        root_path=root_path,
+        **report_v2_json(
+            renderers=[RendererDefinition(root_path=root_path, **renderer_json())],
+            parameters=[ParameterDefinition(**param_json())],
+            **kwargs,
+        ),
+    )
+
+
+def test_report_serialization_memoized(
+    mocker, report_v2_json, renderer_json, param_json, serialization_cache,
+):
+    defs = _create_report('root_path', report_v2_json, renderer_json, param_json)
+    mocked_asdict = mocker.patch('connect.reports.datamodels.asdict', wraps=asdict)
+
+    parameters = defs.get_parameters_json()
+    _create_report('root_path', report_v2_json, renderer_json, param_json)
+
+    assert defs.get_parameters_json() is parameters
+    assert defs.get_renderers_json() is defs.get_renderers_json()
+    assert mocked_asdict.call_count == 1
+    assert serialization_cache.hits == 2
+    assert serialization_cache.misses == 2
+
+
+def test_report_get_methods_not_cached(
+    report_v2_json, renderer_json, param_json, serialization_cache,
+):
+    defs = _create_report('root_path', report_v2_json, renderer_json, param_json)
+    defs.get_renderers_json()
+
+    parameters = defs.get_parameters()
+    parameters[0]['id'] = 'changed'
+    defs.renderers[0].args = {'a': 1}
+    defs.renderers[0].args['a'] = 2
+
+    assert defs.get_parameters() == [param_json()]
+    assert defs.get_renderers()[0]['args'] == {'a': 2}
+
+
+def test_report_serialization_invalidated(
+    report_v2_json, renderer_json, param_json, serialization_cache,
+):
+    defs = _create_report('root_path', report_v2_json, renderer_json, param_json)
+    renderers = defs.get_renderers_json()
+
+    defs.renderers[0].description = 'Changed'
+    assert orjson.loads(defs.get_renderers_json())[0]['description'] == 'Changed'
+    assert serialization_cache.hits == 0
+    assert serialization_cache.misses == 2
+
+    defs.renderers[0].args = {'start_row': 1}
+    assert orjson.loads(defs.get_renderers_json())[0]['args'] == {'start_row': 1}
+
+    defs.renderers.append(RendererDefinition(root_path='root_path', **renderer_json()))
+    assert len(orjson.loads(defs.get_renderers_json())) == 2
+
+    defs.renderers[0].args['key'] = 'value'
+    assert orjson.loads(defs.get_renderers_json())[0]['args'] == {'start_row': 1}
+    invalidate_serializations()
+    assert orjson.loads(defs.get_renderers_json())[0]['args']['key'] == 'value'
+    assert defs.get_renderers_json() != renderers
+
+
+def test_report_serialization_pickled(
+    report_v2_json, renderer_json, param_json, serialization_cache,
+):
+    defs = _create_report('root_path', report_v2_json, renderer_json, param_json)
+    defs.get_parameters_json()
+
+    loaded = pickle.loads(pickle.dumps(defs))
+    loaded.parameters[0].name = 'Changed'
+
+    assert loaded == pickle.loads(pickle.dumps(loaded))
+    assert orjson.loads(loaded.get_parameters_json())[0]['name'] == 'Changed'
+    assert orjson.loads(defs.get_parameters_json())[0]['name'] == param_json()['name']
+
+
+@pytest.mark.parametrize('slots', (False, True))
+def test_serialization_cache_does_not_keep_definitions(
+    report_v2_json, renderer_json, param_json, serialization_cache, slots,
+):
+    model = slotted(ReportDefinition) if slots else ReportDefinition
+    defs = model(
+        root_path='root_path',
+        **report_v2_json(
+            renderers=[RendererDefinition(root_path='root_path', **renderer_json())],
+            parameters=[ParameterDefinition(**param_json())],
+        ),
+    )
+    defs.get_parameters_json()
+    defs.get_renderers_json()
+    defs.name = 'Changed'
+    ref = weakref.ref(defs)
+
+    del defs
+    gc.collect()
+
+    assert ref() is None
+    assert len(serialization_cache) == 2
+
+
+def test_dump_catalogue(report_v2_json, renderer_json, param_json, serialization_cache):
+    tmp_fs = TempFS()
+    tmp_fs.makedirs('reports/report_1')
+    tmp_fs.writetext('readme.md', 'Repository')
+    tmp_fs.writetext('reports/report_1/readme.md', 'Report')
+    report = _create_report(
+        tmp_fs.root_path,
+        report_v2_json,
+        renderer_json,
+        param_json,
+        readme_file='reports/report_1/readme.md',
+        entrypoint='reports.report_1.entrypoint',
+    )
+    repo = RepositoryDefinition(
+        root_path=tmp_fs.root_path,
+        readme_file='readme.md',
+        name='Repository',
+        version='1.0.0',
+        reports=[report],
+    )
+
+    catalogue = dump_catalogue([repo])
+
+    assert orjson.loads(catalogue) == [
+        {
+            'name': 'Repository',
+            'description': 'Repository',
+            'version': '1.0.0',
+            'language': 'python',
+            'reports': [
+                {
+                    'local_id': 'report_1',
+                    'name': report.name,
+                    'description': 'Report',
+                    'entrypoint': 'reports.report_1.entrypoint',
+                    'audience': report.audience,
+                    'report_spec': '2',
+                    'parameters': report.get_parameters(),
+                    'renderers': report.get_renderers(),
+                },
+            ],
+        },
+    ]
+    assert dump_catalogue([repo]) == catalogue
+    assert report.to_json() is report.to_json()
+
+    tmp_fs.writetext('reports/report_1/readme.md', 'New description')
+    path = os.path.join(tmp_fs.root_path, 'reports/report_1/readme.md')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert orjson.loads(dump_catalogue([repo]))[0]['reports'][0]['description'] == (
+        'New description'
+    )
+
+
+def test_slotted_serialization(report_v2_json, renderer_json, serialization_cache):
+    defs = SlottedReportDefinition(
+        root_path='root_path',
+        **report_v2_json(
+            renderers=[SlottedRendererDefinition(root_path='root_path', **renderer_json())],
+            parameters=[],
+        ),
+    )
+
+    assert defs.get_parameters_json() == b'[]'
+    assert orjson.loads(defs.get_renderers_json())[0]['id'] == renderer_json()['id']
+    defs.renderers[0].id = 'changed'
+    assert orjson.loads(defs.get_renderers_json())[0]['id'] == 'changed'
+    assert orjson.loads(pickle.loads(pickle.dumps(defs)).get_renderers_json()) == (
+        defs.get_renderers()
+    )
+
+
+def test_configure_serialization_cache(mocker):
+    mocker.patch('connect.reports.datamodels.serialization_cache', None)
+
+    configure_serialization_cache(max_size=10)
+
+    from connect.reports import datamodels
+    assert datamodels.serialization_cache.max_size == 10
@@ -0,0 +1,188 @@
+#  Copyright © 2022 CloudBlue. All rights reserved.
+
+import json
+import os
+
+import pytest
+from fs.tempfs import TempFS
+
+from connect.reports.datamodels import RepositoryDefinition
+from connect.reports.loader import get_entrypoint_paths, get_referenced_files, load_repository
+
+
+@pytest.fixture
+def repo_fs(repo_json, report_v2_json, renderer_json):
+    tmp_fs = TempFS()
+    tmp_fs.writetext('readme.md', 'Repository')
+    tmp_fs.makedirs('reports/report_package')
+    tmp_fs.writetext('reports/report_package/readme.md', 'Report')
+    tmp_fs.writetext('reports/report_package/template.html.j2', '{{ data }}')
+    report = report_v2_json(
+        readme_file='reports/report_package/readme.md',
+        renderers=[
+            renderer_json(
+                type='jinja2',
+                template='reports/report_package/template.html.j2',
+            ),
+        ],
+    )
+    tmp_fs.writetext(
+        'reports.json',
+        json.dumps(repo_json(readme_file='readme.md', reports=[report])),
+    )
+    return tmp_fs
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_load_repository(repo_fs):
+    repo, errors = load_repository(repo_fs.root_path)
+
+    assert errors == []
+    assert isinstance(repo, RepositoryDefinition)
+    assert repo.reports[0].renderers[0].type == 'jinja2'
+
+
+def test_load_repository_cached(mocker, repo_fs):
+    with TempFS() as cache_fs:
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        assert errors == []
+        assert len(cache_fs.listdir('.')) == 1
+
+        mocked_validate = mocker.patch('connect.reports.loader.validate')
+        mocked_parse = mocker.patch('connect.reports.loader.parse')
+        cached_repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert errors == []
+        assert cached_repo == repo
+        mocked_validate.assert_not_called()
+        mocked_parse.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'changed_file',
+    ('readme.md', 'reports/report_package/readme.md', 'reports/report_package/template.html.j2'),
+)
+def test_load_repository_referenced_file_changed(mocker, repo_fs, changed_file):
+    with TempFS() as cache_fs:
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        _touch(os.path.join(repo_fs.root_path, changed_file))
+
+        mocked_validate = mocker.patch('connect.reports.loader.validate', return_value=[])
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert errors == []
+        mocked_validate.assert_called_once()
+
+
+def test_load_repository_report_package_removed(repo_fs):
+    with TempFS() as cache_fs:
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        repo_fs.removetree('reports/report_package')
+
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert any('does not match the package definition' in error for error in errors)
+
+
+def test_load_repository_report_package_compiled(mocker, repo_fs):
+    with TempFS() as cache_fs:
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        _touch(os.path.join(repo_fs.root_path, 'reports/report_package'))
+        repo_fs.makedirs('reports/report_package/__pycache__')
+
+        mocked_validate = mocker.patch('connect.reports.loader.validate')
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert errors == []
+        mocked_validate.assert_not_called()
+
+
+def test_load_repository_descriptor_changed(repo_fs):
+    with TempFS() as cache_fs:
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        data = json.loads(repo_fs.readtext('reports.json'))
+        data['version'] = '2.0.0'
+        repo_fs.writetext('reports.json', json.dumps(data))
+
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert repo.version == '2.0.0'
+        assert len(cache_fs.listdir('.')) == 2
+
+
+def test_load_repository_package_upgraded(mocker, repo_fs):
+    with TempFS() as cache_fs:
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        mocker.patch('connect.reports.loader._get_package_version', return_value='99.0.0')
+        mocked_validate = mocker.patch('connect.reports.loader.validate', return_value=[])
+
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        mocked_validate.assert_called_once()
+        assert len(cache_fs.listdir('.')) == 2
+
+
+def test_load_repository_errors_not_cached(repo_fs):
+    repo_fs.remove('reports/report_package/readme.md')
+    with TempFS() as cache_fs:
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert 'cannot be resolved to a file' in errors[0]
+        assert cache_fs.listdir('.') == []
+
+
+def test_load_repository_schema_errors(repo_fs):
+    data = json.loads(repo_fs.readtext('reports.json'))
+    data['version'] = 1
+    data.pop('name')
+    repo_fs.writetext('reports.json', json.dumps(data))
+
+    repo, errors = load_repository(repo_fs.root_path)
+
+    assert repo is None
+    assert sorted(errors) == [
+        "$.version: 1 is not of type 'string'",
+        "$: 'name' is a required property",
+    ]
+
+
+def test_load_repository_corrupted_cache(mocker, repo_fs):
+    with TempFS() as cache_fs:
+        load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+        cache_file = cache_fs.listdir('.')[0]
+        cache_fs.writebytes(cache_file, b'corrupted')
+
+        repo, errors = load_repository(repo_fs.root_path, cache_dir=cache_fs.root_path)
+
+        assert errors == []
+        assert repo.name == 'Reports Repository'
+
+
+def test_get_referenced_files(repo_fs):
+    repo, _ = load_repository(repo_fs.root_path)
+
+    assert get_referenced_files(repo) == [
+        os.path.join(repo_fs.root_path, 'readme.md'),
+        os.path.join(repo_fs.root_path, 'reports/report_package/readme.md'),
+        os.path.join(repo_fs.root_path, 'reports/report_package/template.html.j2'),
+    ]
+
+
+def test_get_referenced_files_css_file(repo_fs):
+    repo, _ = load_repository(repo_fs.root_path)
+    repo.reports[0].renderers[0].args = {'css_file': 'reports/report_package/style.css'}
+
+    assert get_referenced_files(repo)[-1] == os.path.join(
+        repo_fs.root_path, 'reports/report_package/style.css',
+    )
+
+
+def test_get_entrypoint_paths(repo_fs):
+    repo, _ = load_repository(repo_fs.root_path)
+
+    report_root = os.path.join(repo_fs.root_path, 'reports/report_package')
+    assert get_entrypoint_paths(repo) == [report_root, f'{report_root}.py']
@@ -1,10 +1,21 @@
 #  Copyright © 2022 CloudBlue. All rights reserved.
 
+import copy
+
+import pytest
+from fs.tempfs import TempFS
+
+from connect.reports.cache import LRUCache
 from connect.reports.datamodels import (
+    LazyReportList,
     ParameterDefinition,
     RendererDefinition,
     ReportDefinition,
     RepositoryDefinition,
+    SlottedParameterDefinition,
+    SlottedRendererDefinition,
+    SlottedReportDefinition,
+    SlottedRepositoryDefinition,
 )
 from connect.reports.parser import parse
 
@@ -21,3 +32,96 @@ def test_parse_default(repo_json):
         assert isinstance(report_def.renderers[0], RendererDefinition)
         assert len(report_def.parameters) == 1
         assert isinstance(report_def.parameters[0], ParameterDefinition)
+
+
+def test_parse_does_not_mutate_data(repo_json):
+    repo = repo_json()
+    expected = copy.deepcopy(repo)
+
+    parse('fake_path', repo)
+    parse('fake_path', repo, lazy=True)
+
+    assert repo == expected
+
+
+def test_parse_lazy(repo_json, report_v2_json):
+    reports = [
+        report_v2_json(entrypoint=f'reports.report_{idx}.entrypoint')
+        for idx in range(10)
+    ]
+    repo = repo_json(reports=reports)
+
+    defs = parse('fake_path', repo, lazy=True)
+
+    assert isinstance(defs.reports, LazyReportList)
+    assert len(defs.reports) == 10
+    assert defs.reports.parsed_count == 0
+
+    report = defs.get_report('report_3')
+    assert isinstance(report, ReportDefinition)
+    assert report.entrypoint == 'reports.report_3.entrypoint'
+    assert report.root_path == 'fake_path'
+    assert defs.reports.parsed_count == 1
+    assert defs.get_report('report_3') is report
+    assert defs.get_report_by_entrypoint('reports.report_3.entrypoint') is report
+    assert defs.get_report('unknown') is None
+    assert defs.get_report_by_entrypoint('unknown') is None
+    assert defs.reports.parsed_count == 1
+
+    assert defs == parse('fake_path', repo)
+    assert defs.reports.parsed_count == 10
+
+
+def test_parse_lazy_sequence(repo_json):
+    defs = parse('fake_path', repo_json(), lazy=True)
+
+    assert [report.report_spec for report in defs.reports] == ['1', '2']
+    assert defs.reports[-1].report_spec == '2'
+    assert [report.report_spec for report in defs.reports[1:]] == ['2']
+    assert defs.reports[0].renderers[0].type == 'xlsx'
+
+
+def test_repository_get_report(repo_json, report_v2_json):
+    repo = repo_json(reports=[report_v2_json(entrypoint='reports.report_1.entrypoint')])
+
+    defs = parse('fake_path', repo)
+
+    assert defs.get_report('report_1') is defs.reports[0]
+    assert defs.get_report_by_entrypoint('reports.report_1.entrypoint') is defs.reports[0]
+    assert defs.get_report('unknown') is None
+
+
+@pytest.mark.parametrize('lazy', (False, True))
+def test_parse_slots(repo_json, lazy):
+    defs = parse('fake_path', repo_json(), lazy=lazy, slots=True)
+
+    assert isinstance(defs, SlottedRepositoryDefinition)
+    for report_def in defs.reports:
+        assert isinstance(report_def, SlottedReportDefinition)
+        assert isinstance(report_def.renderers[0], SlottedRendererDefinition)
+        assert isinstance(report_def.parameters[0], SlottedParameterDefinition)
+    assert defs.reports[0].default_renderer == 'default_xlsx_renderer'
+
+
+@pytest.mark.parametrize('lazy', (False, True))
+def test_parse_preload_descriptions(mocker, repo_json, report_v2_json, lazy):
+    cache = LRUCache(1024)
+    mocker.patch('connect.reports.datamodels.description_cache', cache)
+    tmp_fs = TempFS()
+    tmp_fs.writetext('readme.md', 'Repository')
+    tmp_fs.makedirs('reports/report_1')
+    tmp_fs.writetext('reports/report_1/readme.md', 'Report')
+    repo = repo_json(
+        readme_file='readme.md',
+        reports=[
+            report_v2_json(readme_file='reports/report_1/readme.md'),
+            report_v2_json(readme_file='reports/missing.md'),
+        ],
+    )
+
+    defs = parse(tmp_fs.root_path, repo, lazy=lazy, preload_descriptions=True)
+
+    assert len(cache) == 2
+    assert defs.description == 'Repository'
+    assert defs.reports[0].description == 'Report'
+    assert cache.hits == 2
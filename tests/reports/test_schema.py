@@ -2,7 +2,7 @@
 
 import pytest
 
-from connect.reports.validator import validate_with_schema
+from connect.reports.validator import SchemaError, validate_with_schema
 
 
 @pytest.mark.parametrize(
@@ -373,3 +373,25 @@ def test_choice_object_string_fields(param_json, repo_json, report_v2_json, fiel
 
     assert errors is not None
     assert "1 is not of type 'string'" == errors.splitlines()[0]
+
+
+def test_schema_all_errors(repo_json, report_v1_json, report_v2_json):
+    report_v1 = report_v1_json()
+    report_v1['start_row'] = 0
+    report_v2 = report_v2_json()
+    report_v2.pop('name')
+    repo = repo_json(reports=[report_v1, report_v2])
+    repo['version'] = 1
+
+    errors = validate_with_schema(repo, all_errors=True)
+
+    assert sorted(errors, key=lambda error: error.path) == [
+        SchemaError(path='$.reports[0].start_row', message='0 is less than the minimum of 1'),
+        SchemaError(path='$.reports[1]', message="'name' is a required property"),
+        SchemaError(path='$.version', message="1 is not of type 'string'"),
+    ]
+    assert str(errors[0]).startswith(f'{errors[0].path}: ')
+
+
+def test_schema_all_errors_ok(repo_json):
+    assert validate_with_schema(repo_json(), all_errors=True) == []
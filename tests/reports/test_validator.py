@@ -11,10 +11,13 @@ from connect.reports.datamodels import (
     RepositoryDefinition,
 )
 from connect.reports.validator import (
+    SchemaError,
     _validate_parameters,
     _validate_renderer,
     _validate_report,
+    get_schema_validator,
     validate,
+    validate_with_schema,
 )
 
 
@@ -418,3 +421,56 @@ def _get_tmpfs_with_readme_and_entry(entrypoint):
     tmp_fs.create(script_path)
 
     return tmp_fs
+
+
+@pytest.mark.parametrize('max_workers', (None, 4))
+def test_validator_reports_errors_order(mocker, max_workers):
+    mocker.patch(
+        'connect.reports.validator._validate_report',
+        side_effect=lambda report: [f'error on {report.local_id}'],
+    )
+    tmp_filesystem = TempFS()
+    tmp_filesystem.create('readme.md')
+    repo = mocker.MagicMock(
+        root_path=tmp_filesystem.root_path,
+        readme_file='readme.md',
+        reports=[mocker.MagicMock(local_id=f'report_{idx}') for idx in range(10)],
+    )
+
+    errors = validate(repo, max_workers=max_workers)
+
+    assert errors == [f'error on report_{idx}' for idx in range(10)]
+
+
+def test_schema_validator_cached(mocker, repo_json):
+    get_schema_validator.cache_clear()
+    mocked_open = mocker.patch('connect.reports.validator.open', wraps=open)
+
+    assert validate_with_schema(repo_json()) is None
+    assert validate_with_schema(repo_json()) is None
+
+    mocked_open.assert_called_once()
+    assert get_schema_validator() is get_schema_validator()
+
+
+def test_validator_merges_schema_errors(mocker, param_json):
+    mocker.patch(
+        'connect.reports.validator._validate_report',
+        return_value=['report error'],
+    )
+    repo = mocker.MagicMock(
+        root_path='root_path',
+        readme_file='readme.md',
+        reports=[mocker.MagicMock(local_id='report_id')],
+    )
+
+    errors = validate(
+        repo,
+        schema_errors=[SchemaError(path='$.version', message="1 is not of type 'string'")],
+    )
+
+    assert errors == [
+        "$.version: 1 is not of type 'string'",
+        'repository property `readme_file` cannot be resolved to a file.',
+        'report error',
+    ]